@@ -0,0 +1,72 @@
+import numpy as np
+
+# Combinatorial lower bounds computed before the solve and handed to Gurobi:
+#   - at least min_bars bars must be cut (longest bars first must cover sum(r)),
+#     added as a constraint on the used-bar indicators
+#   - objective lower bounds per formulation, set as BestObjStop so the solve
+#     stops as soon as the incumbent reaches the bound; Gurobi then reports
+#     USER_OBJ_LIMIT, which run_cso_* return as status 'optimal_by_bound'
+#   - params['cutoff'][name] (objective of a known plan in formulation name, e.g.
+#     from dive.py) as Cutoff; the objectives of the formulations are not comparable
+# Switched off with params['bounds'] = False.
+
+USED_BAR_VARS = {'mo': 'YU', 'm1': 'z', 'm2': 'z', 'm3': 'YU'}     # 0 forces an uncut bar in every model
+
+
+def combinatorial_bounds(params, l, r, q=None):
+    l = np.asarray(l, dtype=np.float64)
+    r = np.asarray(r, dtype=np.float64)
+    demand = np.ones(len(r), dtype=np.int64) if q is None else np.asarray(q, dtype=np.int64)
+
+    total = int(r @ demand)
+    covered = np.cumsum(np.sort(l)[::-1])
+    if len(r) == 0 or total > covered[-1] or r.max() > l.max():
+        return None                                     # Infeasible, nothing to bound
+
+    pieces = int(demand.sum())
+    min_bars = int(np.searchsorted(covered, total)) + 1
+    max_bars = min(len(l), pieces)
+    min_cuts = pieces - max_bars                        # Every used bar saves at most one cut
+
+    return {
+        'min_bars': min_bars,
+        'min_cuts': min_cuts,
+        # Lower bounds of the objective of each formulation
+        'objective': {
+            'mo': params['CC'] * min_cuts + max_bars,   # CC * (pieces - U) + U is smallest at U = max_bars
+            'm1': 0.0,                                  # Total waste
+            'm2': 0.0,
+            'm3': 0.0                                   # Waste and retail costs
+            }
+        }
+
+
+def _integral(values):
+    return bool(np.all(np.mod(np.asarray(values, dtype=np.float64), 1) == 0))
+
+
+def apply_bounds(model, v, params, name, n, m, l, r, q=None):
+    from gurobipy import quicksum                       # combinatorial_bounds itself needs no Gurobi
+    if not params.get('bounds', True):
+        return None
+    bounds = combinatorial_bounds(params, l, r, q)
+    if bounds is None:
+        return None
+
+    objective_bound = bounds['objective'][name]
+    lengths_integral = _integral(l) and _integral(r)    # The knapsack DP runs on integer lengths
+    if name == 'mo' and params.get('lagrangian_bound') and lengths_integral:
+        from lagrangian import lagrangian_bound
+        objective_bound = max(objective_bound, lagrangian_bound(params, n, m, l, r, q=q)['lower_bound'])
+        if _integral([params['CC'], params['CW']]):     # Integer costs and lengths: integer objective
+            objective_bound = np.ceil(objective_bound - 1e-6)
+
+    used = v[USED_BAR_VARS[name]]
+    model.addConstr(quicksum(used[j] for j in range(n)) >= bounds['min_bars'], name="min_used_bars")
+    model.setParam('BestObjStop', objective_bound + 1e-6 * max(1.0, abs(objective_bound)))
+    cutoff = (params.get('cutoff') or {}).get(name)
+    if cutoff is not None:
+        model.setParam('Cutoff', cutoff + 1e-6 * max(1.0, abs(cutoff)))
+
+    bounds['objective_bound'] = objective_bound
+    return bounds
@@ -0,0 +1,153 @@
+import argparse
+import json
+import subprocess
+import sys
+import time
+from models import BATCH_MODELS, MODELS                 # Only imports importlib
+
+# Command line entry point. Only argparse and the standard library are imported
+# at startup; NumPy, pandas and gurobipy are imported by the subcommand that
+# needs them.
+#
+#   python cli.py solve --model mo --l 107,195,280 --r 70,44,69
+#   python cli.py solve --model m1 --seed 3
+#   python cli.py solve --model mo --l 300,300,250 --r 50,120 --q 6,2
+#   python cli.py batch --runs 100 --config params.json --set W=50 --profile
+#   python cli.py benchmark --runs 5
+
+MODEL_NAMES = list(MODELS)
+
+
+def _int_list(text):
+    return [int(value) for value in text.split(',')]
+
+
+def _value(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def load_params(args):
+    # Defaults < config file (JSON object) < --set KEY=VALUE options
+    from instances import DEFAULT_PARAMS
+    params = dict(DEFAULT_PARAMS)
+    if args.config:
+        with open(args.config) as file:
+            params.update(json.load(file))
+    for item in args.set:
+        key, _, value = item.partition('=')
+        params[key] = _value(value)
+    return params
+
+
+def _print_result(result):
+    for key, value in result.items():
+        if key != 'plan':
+            print(f"{key:>12}: {value}")
+
+
+def cmd_solve(args):
+    import numpy as np
+    from instances import generate_random_data
+    from models import get_model
+
+    params = load_params(args)
+    if (args.l is None) != (args.r is None):
+        raise SystemExit("--l and --r must be given together")
+    if args.l is not None:
+        l, r = np.array(args.l), np.array(args.r)
+        n, m = len(l), len(r)
+    else:
+        n, m, l, r = generate_random_data(params, np.random.RandomState(args.seed))
+    q = np.array(args.q) if args.q else None            # Quantities per order length
+    if q is not None and len(q) != m:
+        raise SystemExit("--q needs one quantity per --r length")
+    result = get_model(args.model)(params, n, m, l, r, args.run_id, q=q)
+    _print_result(result)
+
+
+def cmd_batch(args):
+    import profiling
+    if args.profile:
+        profiling.enable(args.profile)
+    from mainRunner2 import run_batch
+    if args.seed is not None:
+        import numpy as np
+        np.random.seed(args.seed)
+    run_batch(load_params(args), args.runs, args.output, args.models)
+
+
+def cold_start(command, repeat):
+    # Best wall time of a fresh interpreter running command
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        subprocess.run([sys.executable] + command, check=True, capture_output=True)
+        times.append(time.perf_counter() - start_time)
+    return min(times)
+
+
+def cmd_benchmark(args):
+    print("Cold start (best of %d):" % args.repeat)
+    for label, command in [
+            ('interpreter', ['-c', 'pass']),
+            ('cli --help', [__file__, '--help']),
+            ('import mainRunner2', ['-c', 'import mainRunner2']),
+            ('import numpy', ['-c', 'import numpy']),
+            ('import gurobipy', ['-c', 'import gurobipy'])]:
+        try:
+            print(f"  {label:<20} {cold_start(command, args.repeat) * 1000:8.1f} ms")
+        except subprocess.CalledProcessError:
+            print(f"  {label:<20} {'failed':>8}")
+
+    import numpy as np
+    from instances import seeded_instances
+    from models import get_model
+
+    params = load_params(args)
+    instances = seeded_instances(params, args.runs, args.seed or 0)
+    print(f"Solve times over {args.runs} seeded instances:")
+    for name in args.models:
+        model_func = get_model(name)
+        times = [model_func(params, n, m, l, r, run_id).get('solve_time', np.nan)
+                 for run_id, (n, m, l, r) in enumerate(instances, start=1)]
+        print(f"  {name:<6} mean {np.nanmean(times):8.4f} s   max {np.nanmax(times):8.4f} s")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="One-dimensional cutting stock optimizer with usable leftovers")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--config', help="JSON file with parameter overrides")
+    common.add_argument('--set', action='append', default=[], metavar='KEY=VALUE', help="override one parameter")
+    common.add_argument('--seed', type=int, default=None, help="random seed for generated instances")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    solve = subparsers.add_parser('solve', parents=[common], help="solve one instance")
+    solve.add_argument('--model', choices=MODEL_NAMES, default='mo')
+    solve.add_argument('--l', type=_int_list, help="bar lengths, comma separated")
+    solve.add_argument('--r', type=_int_list, help="order lengths, comma separated")
+    solve.add_argument('--q', type=_int_list, help="quantity per order length, comma separated")
+    solve.add_argument('--run-id', type=int, default=1)
+    solve.set_defaults(func=cmd_solve)
+
+    batch = subparsers.add_parser('batch', parents=[common], help="run the batch experiment")
+    batch.add_argument('--runs', type=int, default=100)
+    batch.add_argument('--models', nargs='+', choices=MODEL_NAMES, default=BATCH_MODELS)
+    batch.add_argument('--output', default="cutting_stock_results.xlsx")
+    batch.add_argument('--profile', nargs='?', const='1', default=None,
+                       help="stage profiling, optionally 'cprofile' and/or 'memory'")
+    batch.set_defaults(func=cmd_batch)
+
+    benchmark = subparsers.add_parser('benchmark', parents=[common], help="cold start and solve time benchmark")
+    benchmark.add_argument('--runs', type=int, default=5)
+    benchmark.add_argument('--repeat', type=int, default=5)
+    benchmark.add_argument('--models', nargs='+', choices=MODEL_NAMES, default=BATCH_MODELS)
+    benchmark.set_defaults(func=cmd_benchmark)
+    return parser
+
+
+if __name__ == '__main__':
+    args = build_parser().parse_args()
+    args.func(args)
@@ -0,0 +1,79 @@
+from gurobipy import GRB
+import numpy as np
+import time
+from mo import build_mo
+from plan import plan_metrics, greedy_repair
+from solver import configure_model
+
+# LP dive heuristic on the own model (mo.py): solve the LP relaxation, fix the
+# nearly integral X[i, j], re-solve the reduced LP and repeat. Pieces that are
+# still open at the end are placed by greedy_repair. The resulting plan can be
+# returned as is (fast mode) or handed to run_cso_mo(..., start=plan).
+
+
+def dive_plan(params, n, m, l, r, run_id, max_rounds=20, tol=1e-3, env=None, q=None):
+    model, v = build_mo(params, n, m, l, r, run_id, env, q)
+    X = v['X']
+
+    for var in model.getVars():                         # LP relaxation
+        var.VType = GRB.CONTINUOUS
+    configure_model(model, params)  # Output off, solver settings from params
+
+    plan = np.zeros((m, n), dtype=np.int64)
+    fixed = np.zeros((m, n), dtype=bool)
+    remaining = np.ones(m, dtype=np.int64) if q is None else np.array(q, dtype=np.int64)
+
+    for _ in range(max_rounds):
+        model.optimize()
+        if model.status != GRB.OPTIMAL:
+            break
+
+        values = np.array([[X[i, j].X for j in range(n)] for i in range(m)])
+        residual = np.asarray(l) - np.asarray(r) @ plan
+        fits = np.asarray(r)[:, None] <= residual[None, :]  # One more piece still fits on the bar
+        values[fixed | (remaining == 0)[:, None] | ~fits] = -1
+        rounded = np.round(values)
+        chosen = np.argwhere((np.abs(values - rounded) <= tol) & (rounded >= 1))
+        if len(chosen) == 0:                            # Nothing integral: dive on the largest value
+            i, j = np.unravel_index(np.argmax(values), values.shape)
+            if values[i, j] < 0:                        # No open piece fits anywhere: leave it to repair
+                break
+            chosen = [(i, j)]
+
+        for i, j in chosen:
+            count = min(max(int(np.ceil(values[i, j] - tol)), 1), remaining[i], residual[j] // r[i])
+            if count == 0:
+                continue
+            residual[j] -= count * r[i]
+            X[i, j].LB = X[i, j].UB = count
+            plan[i, j] = count
+            fixed[i, j] = True
+            remaining[i] -= count
+            if remaining[i] == 0:                       # Order complete: no other bar may take it
+                for k in np.flatnonzero(~fixed[i]):
+                    X[i, k].LB = X[i, k].UB = 0
+                fixed[i] = True
+
+        if not remaining.any():
+            break
+
+    return greedy_repair(l, r, plan, q)
+
+
+def run_cso_dive(params, n, m, l, r, run_id, **kwargs):
+    start_time = time.time()
+    plan = dive_plan(params, n, m, l, r, run_id, **kwargs)
+    elapsed_time = time.time() - start_time
+
+    if plan is None:
+        return {
+            'run': run_id,
+            'model': 'dive',
+            'status': 'infeasible'
+            }
+
+    result = {'run': run_id, 'model': 'dive'}
+    result.update(plan_metrics(params, l, r, plan))
+    result['solve_time'] = elapsed_time
+    result['plan'] = plan
+    return result
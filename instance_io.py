@@ -0,0 +1,152 @@
+import os
+import numpy as np
+from instances import aggregate_orders, demand_from_pairs
+
+# Instance I/O for large stock inventories. Tables are read as memory-mapped
+# NumPy columns: .npy files directly (plain or structured arrays), CSV and
+# Parquet through a one-time .npy cache next to the source file. Bars are then
+# selected for the current orders in chunks, so a solve only materializes the
+# bars it can use.
+
+CHUNK_SIZE = 1_000_000
+
+
+def _cache_path(path, column):
+    return f"{path}.{column}.npy"
+
+
+def _is_fresh(cache, path):
+    return os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(path)
+
+
+def _csv_to_npy(path, columns):
+    import pandas as pd
+    # Rows as pandas parses them (blank lines and quoted newlines included),
+    # counted in a first pass over a single column
+    rows = sum(len(frame) for frame in pd.read_csv(path, usecols=columns[:1], chunksize=CHUNK_SIZE))
+
+    outputs = {}
+    offset = 0
+    for frame in pd.read_csv(path, usecols=columns, chunksize=CHUNK_SIZE):
+        for column in columns:
+            values = frame[column].to_numpy()
+            if column not in outputs:
+                outputs[column] = np.lib.format.open_memmap(_cache_path(path, column), mode='w+',
+                                                            dtype=values.dtype, shape=(rows,))
+            outputs[column][offset:offset + len(values)] = values
+        offset += len(frame)
+    for output in outputs.values():
+        output.flush()
+
+
+def _parquet_to_npy(path, columns):
+    import pyarrow.parquet as pq                        # Optional, only needed for Parquet input
+    table = pq.ParquetFile(path)
+    rows = table.metadata.num_rows
+
+    outputs = {}
+    offset = 0
+    for batch in table.iter_batches(batch_size=CHUNK_SIZE, columns=columns):
+        for column in columns:
+            values = batch.column(column).to_numpy(zero_copy_only=False)
+            if column not in outputs:
+                outputs[column] = np.lib.format.open_memmap(_cache_path(path, column), mode='w+',
+                                                            dtype=values.dtype, shape=(rows,))
+            outputs[column][offset:offset + len(values)] = values
+        offset += batch.num_rows
+    for output in outputs.values():
+        output.flush()
+
+
+def open_columns(path, columns):
+    # {column: read-only memmap}. A plain 1-D .npy file is one unnamed column,
+    # returned under the first requested name.
+    if path.endswith('.npy'):
+        table = np.load(path, mmap_mode='r')
+        if table.dtype.names is None:
+            return {columns[0]: table}
+        return {column: table[column] for column in columns}
+
+    stale = [column for column in columns if not _is_fresh(_cache_path(path, column), path)]
+    if stale:
+        if path.endswith('.csv'):
+            _csv_to_npy(path, stale)
+        elif path.endswith('.parquet'):
+            _parquet_to_npy(path, stale)
+        else:
+            raise ValueError(f"Unsupported table format: {path}")
+    return {column: np.load(_cache_path(path, column), mmap_mode='r') for column in columns}
+
+
+def filter_rows(table, column, min_value=None, max_value=None, where=None, chunk_size=CHUNK_SIZE):
+    # Row indices with min_value <= table[column] <= max_value and
+    # table[key] == value for every key, value in where, scanned chunk by chunk
+    where = where or {}
+    total = len(table[column])
+    selected = []
+    for start in range(0, total, chunk_size):
+        stop = min(start + chunk_size, total)
+        values = table[column][start:stop]
+        mask = np.ones(stop - start, dtype=bool)
+        if min_value is not None:
+            mask &= values >= min_value
+        if max_value is not None:
+            mask &= values <= max_value
+        for key, value in where.items():
+            mask &= table[key][start:stop] == value
+        selected.append(np.flatnonzero(mask) + start)
+    return np.concatenate(selected) if selected else np.zeros(0, dtype=np.int64)
+
+
+def select_bars(lengths, r, rows=None, per_order=2, slack=1.5, max_bars=None, q=None):
+    # Candidate bars for the orders r: every order claims the per_order shortest
+    # free bars it fits on (so one order per bar is always possible if the
+    # inventory allows it), then the shortest remaining bars are added until the
+    # pool holds slack * sum(r) length. With quantities q every piece claims its
+    # own bars. Returns inventory row ids and lengths.
+    r = np.asarray(r) if q is None else np.repeat(r, q)
+    if rows is None:
+        rows = filter_rows({'length': lengths}, 'length', min_value=r.min())
+    candidates = np.asarray(lengths[rows])
+    order = np.argsort(candidates, kind='stable')
+    rows = rows[order]
+    candidates = candidates[order]
+
+    taken = np.zeros(len(rows), dtype=bool)
+    claims = [[] for _ in range(per_order)]             # claims[k]: k-th bar claimed by each order, longest first
+    for length in np.sort(r)[::-1]:
+        position = int(np.searchsorted(candidates, length))
+        claimed = 0
+        while position < len(rows) and claimed < per_order:
+            if not taken[position]:
+                taken[position] = True
+                claims[claimed].append(position)
+                claimed += 1
+            position += 1
+
+    chosen = np.array([position for rank in claims for position in rank], dtype=np.int64)
+    target = slack * r.sum() - candidates[chosen].sum()
+    if target > 0:
+        free = np.flatnonzero(~taken)
+        extra = np.searchsorted(np.cumsum(candidates[free]), target) + 1
+        chosen = np.concatenate([chosen, free[:extra]])
+
+    if max_bars is not None:                            # First claim of every order is kept first
+        chosen = chosen[:max_bars]
+    return rows[chosen], candidates[chosen]
+
+
+def load_instance(stock_path, orders_path, length_column='length', quantity_column=None,
+                  where=None, **select_kwargs):
+    # (n, m, l, r, q, bar_ids): distinct order lengths r with quantities q, ready
+    # for run_cso_*(params, n, m, l, r, run_id, q=q)
+    orders = open_columns(orders_path, [length_column] + ([quantity_column] if quantity_column else []))
+    if quantity_column:
+        r, q = demand_from_pairs(np.column_stack([orders[length_column], orders[quantity_column]]))
+    else:                                               # One row per piece
+        r, q = aggregate_orders(orders[length_column])
+
+    stock = open_columns(stock_path, [length_column] + list(where or {}))
+    rows = filter_rows(stock, length_column, min_value=r.min(), where=where)
+    bar_ids, l = select_bars(stock[length_column], r, rows=rows, q=q, **select_kwargs)
+    return len(l), len(r), l, r, q, bar_ids
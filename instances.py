@@ -0,0 +1,40 @@
+import numpy as np
+
+DEFAULT_PARAMS = {
+    'minB': 9, 'maxB': 11,          # Min and max number of bars
+    'minO': 5, 'maxO': 10,          # Min and max number of orderstask
+    'MaxBarLength': 300,            # Max length of bars
+    'W': 45,                        # Waste limit length
+    'CC': 400,                      # Cost of a cut
+    'CW': 100,                      # Unit cost of waste
+    'CR': 200,                      # Cost of returning a reusable leftover to stock
+    'BIGM': 1000,
+    'epsilon': 1e-3
+}
+
+
+def generate_random_data(params, rng=np.random):
+    # rng: np.random (global state) or a seeded np.random.RandomState
+    n = rng.randint(params['minB'], params['maxB'])               # Number of bars
+    m = rng.randint(params['minO'], params['maxO'])               # Number of orders
+    l = rng.randint(params['W'], params['MaxBarLength'], size=n)  # Stock lengths
+    r = rng.randint(1, params['MaxBarLength'], size=m)            # Order lengths
+    return n, m, l, r
+
+
+def seeded_instances(params, count, seed=0):
+    # Reproducible instance list: instance k is drawn from RandomState(seed + k)
+    return [generate_random_data(params, np.random.RandomState(seed + k)) for k in range(count)]
+
+
+def demand_from_pairs(pairs):
+    # (length, quantity) pairs -> distinct order lengths r and quantities q
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    r, inverse = np.unique(pairs[:, 0], return_inverse=True)
+    q = np.bincount(inverse, weights=pairs[:, 1]).astype(np.int64)
+    return r, q
+
+
+def aggregate_orders(r):
+    # One entry per piece -> distinct order lengths r and quantities q
+    return np.unique(np.asarray(r), return_counts=True)
@@ -0,0 +1,156 @@
+import numpy as np
+import time
+
+# Lagrangian lower bound for the own model (mo.py) objective
+#
+#   CC * sum_j (sum_i X[i, j] - 1 + YL[j]) + CW * sum_j WL[j] + sum_j YU[j]
+#
+# The order assignment constraint (sum_j X[i, j] == 1) is relaxed with a
+# multiplier u[i] per order. What remains splits into independent per-bar
+# knapsacks: bar j picks any subset of orders that fits into l[j] and pays its
+# cuts, its waste (leftover shorter than W) and its usage, minus the sum of the
+# multipliers of the orders it takes. Every bar sees the same orders, so one
+# exact-load 0/1 knapsack DP over all lengths up to max(l) is shared by all bars.
+#
+# With a demand vector q (sum_j X[i, j] == q[i]) the knapsack is bounded: each
+# order type is split into items of 1, 2, 4, ... pieces for the same 0/1 DP.
+
+
+def _split_items(r, q):
+    # Order types -> 0/1 knapsack items (type, pieces, length) by binary splitting
+    types, pieces = [], []
+    for i in range(len(r)):
+        remaining = 1 if q is None else int(q[i])
+        size = 1
+        while remaining > 0:
+            take = min(size, remaining)
+            types.append(i)
+            pieces.append(take)
+            remaining -= take
+            size *= 2
+    types = np.array(types, dtype=np.int64)
+    pieces = np.array(pieces, dtype=np.int64)
+    return types, pieces, pieces * np.asarray(r, dtype=np.int64)[types]
+
+
+def _knapsack(values, r, capacity):
+    # best[c] = max total value of an order subset with total length exactly c
+    best = np.full(capacity + 1, -np.inf)
+    best[0] = 0.0
+    take = np.zeros((len(r), capacity + 1), dtype=bool)
+    for i in range(len(r)):
+        ri = int(r[i])
+        if ri > capacity:
+            continue
+        candidate = best[:-ri] + values[i] if ri > 0 else best + values[i]
+        improved = candidate > best[ri:]
+        take[i, ri:] = improved
+        best[ri:] = np.where(improved, candidate, best[ri:])
+    return best, take
+
+
+def _backtrack(take, r, load):
+    # Orders chosen for a given load, recovered from the DP decision table
+    chosen = []
+    for i in range(len(r) - 1, -1, -1):
+        if load <= 0:
+            break
+        if take[i, load]:
+            chosen.append(i)
+            load -= int(r[i])
+    return chosen
+
+
+def _bar_costs(params, length, best):
+    # Cost of bar j for every possible load c = 0..l[j] (without the multipliers
+    # already contained in best[c])
+    load = np.arange(length + 1)
+    leftover = length - load
+    waste = np.where(leftover < params['W'], leftover, 0)
+    cuts = -1 + (leftover > 0)                          # sum_i X[i, j] is in best[c]
+    costs = params['CC'] * cuts + params['CW'] * waste + 1 - best[:length + 1]
+    costs[0] = params['CW'] * waste[0]                  # unused bar: no cuts, YU = 0
+    return costs
+
+
+def lagrangian_bound(params, n, m, l, r, upper_bound=None, max_iter=200, step_scale=2.0,
+                     min_step_scale=1e-3, patience=10, q=None):
+    start_time = time.time()
+
+    if np.any(np.mod(l, 1) != 0) or np.any(np.mod(r, 1) != 0):
+        raise ValueError("lagrangian_bound needs integer bar and order lengths")
+    l = np.asarray(l, dtype=np.int64)
+    r = np.asarray(r, dtype=np.int64)
+    capacity = int(l.max())
+    demand = np.ones(m) if q is None else np.asarray(q, dtype=np.float64)
+    item_type, item_pieces, item_length = _split_items(r, q)
+
+    u = np.full(m, float(params['CC']))                 # Multipliers of the relaxed constraints
+    best_bound = -np.inf
+    best_u = u.copy()
+    stall = 0
+    iterations = 0
+
+    for iterations in range(1, max_iter + 1):
+        best, take = _knapsack((u - params['CC'])[item_type] * item_pieces, item_length, capacity)
+
+        # Solve every bar subproblem and collect how often each order got picked
+        value = u @ demand
+        counts = np.zeros(m)
+        for j in range(n):
+            costs = _bar_costs(params, int(l[j]), best)
+            load = int(np.argmin(costs))
+            value += costs[load]
+            chosen = _backtrack(take, item_length, load)
+            np.add.at(counts, item_type[chosen], item_pieces[chosen])
+
+        if value > best_bound + 1e-9:
+            best_bound = value
+            best_u = u.copy()
+            stall = 0
+        else:
+            stall += 1
+            if stall >= patience:                       # Halve the step after a stall
+                step_scale /= 2
+                stall = 0
+
+        subgradient = demand - counts
+        norm = float(subgradient @ subgradient)
+        if norm == 0 or step_scale < min_step_scale:   # Relaxed solution is feasible or steps vanished
+            break
+        if upper_bound is not None and best_bound >= upper_bound - 1e-6:
+            break
+
+        # Polyak step towards the incumbent if known, diminishing step otherwise
+        if upper_bound is not None:
+            step = step_scale * (upper_bound - value) / norm
+        else:
+            step = step_scale * params['CC'] / (iterations * np.sqrt(norm))
+        u = u + step * subgradient
+
+    return {
+        'lower_bound': best_bound,
+        'iterations': iterations,
+        'multipliers': best_u,
+        'bound_time': time.time() - start_time
+        }
+
+
+def optimality_gap(objective, lower_bound):
+    # Relative gap of an incumbent objective value against a lower bound
+    if objective == 0:
+        return 0.0 if lower_bound >= 0 else float('inf')
+    return max(0.0, (objective - lower_bound) / abs(objective))
+
+
+def attach_bound(result, params, n, m, l, r, **kwargs):
+    # Reports the Lagrangian bound and the gap next to an own-model (mo) result.
+    # The mo objective also counts used bars on top of total_cost.
+    if result.get('status') == 'infeasible':
+        return result
+    objective = result['total_cost'] + result['used_bars']
+    kwargs.setdefault('upper_bound', objective)         # Polyak steps towards the incumbent
+    bound = lagrangian_bound(params, n, m, l, r, **kwargs)
+    result['lower_bound'] = bound['lower_bound']
+    result['gap'] = optimality_gap(objective, bound['lower_bound'])
+    return result
@@ -1,12 +1,18 @@
 from gurobipy import Model, GRB, quicksum
 import time
+import profiling
+from solver import configure_model, has_solution, solve_status, solution_plan, assignment_vars, order_demand
+from model_cache import cached_build
+from plan import plan_metrics
+from bounds import apply_bounds
 
 
-def run_cso_m1(params, n, m, l, r, run_id):
-    model = Model(f"Model1_Run_{run_id}")
+def build_m1(params, n, m, l, r, run_id, env=None, q=None):
+    model = Model(f"Model1_Run_{run_id}", env=env)
     
     # Variables
-    X = model.addVars(m, n, vtype=GRB.BINARY, name="X")                 # Assignment matrix
+    X = assignment_vars(model, m, n, l, r, q)                           # Assignment matrix (counts if q is given)
+    demand = order_demand(m, q)
     LOl = model.addVars(n, vtype=GRB.CONTINUOUS, lb=0, name="LOl")      # Leftover length
     YR = model.addVars(n, vtype=GRB.BINARY, name="YR")                  # Reusable leftover indicator
     WL = model.addVars(n, vtype=GRB.CONTINUOUS, lb=0, name="WL")        # Waste length
@@ -26,7 +32,7 @@ def run_cso_m1(params, n, m, l, r, run_id):
     
     # 2 Ensures that all ordered items are cut in the required quantities
     for i in range(m):
-        model.addConstr(quicksum(X[i, j] for j in range(n)) == 1)
+        model.addConstr(quicksum(X[i, j] for j in range(n)) == demand[i])
         
     # 3 If any items are cut from an object, the binary z_j is set to 1
     for j in range(n):
@@ -76,22 +82,35 @@ def run_cso_m1(params, n, m, l, r, run_id):
     # 14 At most one object can become retail
     for j in range(n):
         model.addConstr(YLR[j] <= 1)
-    
+
+    return model, {'X': X, 'LOl': LOl, 'YR': YR, 'WL': WL, 'z': z, 'YLR': YLR}
+
+
+def run_cso_m1(params, n, m, l, r, run_id, env=None, q=None):
+    prof = profiling.start('model1')
+    model, v = cached_build('m1', build_m1, params, n, m, l, r, run_id, env, q)
+    X, WL = v['X'], v['WL']
+
+    prof.lap('build')
 
     start_time = time.time()
-    model.setParam('OutputFlag', 0)  # Disable(0) / enable(1) detailed solver output
+    configure_model(model, params, 'm1', n, m)  # Output off, solver settings from params
+    apply_bounds(model, v, params, 'm1', n, m, l, r, q)  # Lower bounds, stop once the incumbent reaches them
     model.optimize()
     elapsed_time = time.time() - start_time
+    prof.lap('solve')
     
 
-    if model.status == GRB.OPTIMAL:    
-        cuts = sum(sum(X[i, j].X for i in range(m)) - 1 
-        + (1 if l[j] > sum(X[i, j].X * r[i] for i in range(m)) else 0)for j in range(n))
+    if has_solution(model):    
+        plan = solution_plan(X, m, n)                   # Rounded, so 0.99999 binaries count as cut
+        figures = plan_metrics(params, l, r, plan)
+        cuts = figures['cuts']
         
-        used_bars = sum(1 for j in range(n) if sum(X[i, j].X for i in range(m)) > 0)
+        used_bars = figures['used_bars']
         
         waste = sum(WL[j].X for j in range(n))
         
+        prof.lap('extract')
         return {
             'run': run_id,
             'model': 'model1',
@@ -101,7 +120,9 @@ def run_cso_m1(params, n, m, l, r, run_id):
             'waste_cost': waste * params['CW'],
             'used_bars': used_bars,
             'total_cost': cuts * params['CC'] + waste * params['CW'],
-            'solve_time': elapsed_time
+            'solve_time': elapsed_time,
+            'status': solve_status(model),
+            'plan': plan
             }
     else:
         return {
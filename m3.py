@@ -1,12 +1,18 @@
 from gurobipy import Model, GRB, quicksum
 import time
+import profiling
+from solver import configure_model, has_solution, solve_status, solution_plan, assignment_vars, order_demand
+from model_cache import cached_build
+from plan import plan_metrics
+from bounds import apply_bounds
 
 
-def run_cso_m3(params, n, m, l, r, run_id):
-    model = Model(f"Model3_Run_{run_id}")
+def build_m3(params, n, m, l, r, run_id, env=None, q=None):
+    model = Model(f"Model3_Run_{run_id}", env=env)
     
     # Variables
-    X = model.addVars(m, n, vtype=GRB.BINARY, name="X")                 # Assignment matrix
+    X = assignment_vars(model, m, n, l, r, q)                           # Assignment matrix (counts if q is given)
+    demand = order_demand(m, q)
     LOl = model.addVars(n, vtype=GRB.CONTINUOUS, lb=0, name="LOl")      # Leftover length
     WL = model.addVars(n, vtype=GRB.CONTINUOUS, lb=0, name="WL")        # Waste length
     YU = model.addVars(n, vtype=GRB.BINARY, name="YU")                  # Used bar indicator
@@ -25,7 +31,7 @@ def run_cso_m3(params, n, m, l, r, run_id):
     
     # 2 Guarantees all ordered items are cut
     for i in range(m):
-        model.addConstr(quicksum(X[i, j] for j in range(n)) == 1)
+        model.addConstr(quicksum(X[i, j] for j in range(n)) == demand[i])
         
     # 3 Ensures leftover is large enough to be retail if classified as such
     for j in range(n):
@@ -34,24 +40,37 @@ def run_cso_m3(params, n, m, l, r, run_id):
     # 4 Limits waste and retail classification
     for j in range(n):
         model.addConstr(LOl[j] - WL[j] - (YLR[j] + (1 - YU[j])) * max(l) <= 0)
-        
-    
+
+    return model, {'X': X, 'LOl': LOl, 'WL': WL, 'YU': YU, 'YLR': YLR}
+
+
+def run_cso_m3(params, n, m, l, r, run_id, env=None, q=None):
+    prof = profiling.start('model3')
+    model, v = cached_build('m3', build_m3, params, n, m, l, r, run_id, env, q)
+    X, WL, YU = v['X'], v['WL'], v['YU']
+
+    prof.lap('build')
+
     start_time = time.time()
-    model.setParam('OutputFlag', 0)  # Disable(0) / enable(1) detailed solver output
+    configure_model(model, params, 'm3', n, m)  # Output off, solver settings from params
+    apply_bounds(model, v, params, 'm3', n, m, l, r, q)  # Lower bounds, stop once the incumbent reaches them
     model.optimize()
     elapsed_time = time.time() - start_time
+    prof.lap('solve')
     
 
-    if model.status == GRB.OPTIMAL:
-        cuts = sum(sum(X[i, j].X for i in range(m)) - 1 
-        + (1 if l[j] > sum(X[i, j].X * r[i] for i in range(m)) else 0)for j in range(n))
+    if has_solution(model):
+        plan = solution_plan(X, m, n)                   # Rounded, so 0.99999 binaries count as cut
+        figures = plan_metrics(params, l, r, plan)
+        cuts = figures['cuts']
         
-        used_bars = sum(YU[j].X for j in range(n))
+        used_bars = figures['used_bars']
         
         #used_bars2 = sum(1 for j in range(n) if sum(X[i, j].X for i in range(m)) > 0)
         
         waste =sum(WL[j].X for j in range(n))
         
+        prof.lap('extract')
         return {
             'run': run_id,
             'model': 'model3',
@@ -61,7 +80,9 @@ def run_cso_m3(params, n, m, l, r, run_id):
             'waste_cost': waste * params['CW'],
             'used_bars': used_bars,
             'total_cost': cuts * params['CC'] + waste * params['CW'],
-            'solve_time': elapsed_time
+            'solve_time': elapsed_time,
+            'status': solve_status(model),
+            'plan': plan
             }
     else:
         return {
@@ -1,12 +1,17 @@
 from gurobipy import Model, GRB, quicksum
 import time
+import profiling
+from solver import configure_model, has_solution, solve_status, solution_plan, assignment_vars, order_demand
+from model_cache import cached_build
+from bounds import apply_bounds
 
 
-def run_cso_mo(params, n, m, l, r, run_id):
-    model = Model(f"OwnModel_Run_{run_id}")
+def build_mo(params, n, m, l, r, run_id, env=None, q=None):
+    model = Model(f"OwnModel_Run_{run_id}", env=env)
     
     # Variables
-    X = model.addVars(m, n, vtype=GRB.BINARY, name="X")                 # Assignment matrix
+    X = assignment_vars(model, m, n, l, r, q)                           # Assignment matrix (counts if q is given)
+    demand = order_demand(m, q)
     LOl = model.addVars(n, vtype=GRB.CONTINUOUS, lb=0, name="LOl")      # Leftover length
     YL = model.addVars(n, vtype=GRB.BINARY, name="YL")                  # Leftover indicator
     YR = model.addVars(n, vtype=GRB.BINARY, name="YR")                  # Reusable leftover indicator
@@ -25,7 +30,7 @@ def run_cso_mo(params, n, m, l, r, run_id):
 
     # 1. Each order must be assigned exactly once
     for i in range(m):
-        model.addConstr(quicksum(X[i, j] for j in range(n)) == 1, name=f"order_assigned_{i}")
+        model.addConstr(quicksum(X[i, j] for j in range(n)) == demand[i], name=f"order_assigned_{i}")
 
     # 2. Bar usage constraint (sum of assigned order lengths + leftover = bar length)
     for j in range(n):
@@ -44,15 +49,32 @@ def run_cso_mo(params, n, m, l, r, run_id):
     for j in range(n):
         model.addConstr(YU[j] >= quicksum(X[i, j] for i in range(m)) / params['BIGM'], name=f"object_usage_{j}")
 
+    return model, {'X': X, 'LOl': LOl, 'YL': YL, 'YR': YR, 'WL': WL, 'YU': YU}
+
+
+def run_cso_mo(params, n, m, l, r, run_id, start=None, env=None, q=None):
+    prof = profiling.start('modelO')
+    model, v = cached_build('mo', build_mo, params, n, m, l, r, run_id, env, q)
+    X, YL, WL, YU = v['X'], v['YL'], v['WL'], v['YU']
+
+    # MIP start from a heuristic plan (m x n assignment matrix), e.g. dive.py
+    if start is not None:
+        for i in range(m):
+            for j in range(n):
+                X[i, j].Start = start[i][j]
+
+    prof.lap('build')
 
     # Solve model
     start_time = time.time()
-    model.setParam('OutputFlag', 0)  # Disable(0) / enable(1) detailed solver output
+    configure_model(model, params, 'mo', n, m)  # Output off, solver settings from params
+    apply_bounds(model, v, params, 'mo', n, m, l, r, q)  # Lower bounds, stop once the incumbent reaches them
     model.optimize()
     elapsed_time = time.time() - start_time
+    prof.lap('solve')
     
 
-    if model.status == GRB.OPTIMAL:
+    if has_solution(model):
         cuts = sum(sum(X[i, j].X for i in range(m)) - 1 + YL[j].X for j in range(n))
         
         #cuts2 = sum(sum(X[i, j].X for i in range(m)) - 1 
@@ -62,6 +84,7 @@ def run_cso_mo(params, n, m, l, r, run_id):
         
         waste = sum(WL[j].X for j in range(n))
         
+        prof.lap('extract')
         return {
             'run': run_id,
             'bars': n,
@@ -74,8 +97,8 @@ def run_cso_mo(params, n, m, l, r, run_id):
             'used_bars': used_bars,
             'total_cost': cuts * params['CC'] + waste * params['CW'],
             'solve_time': elapsed_time,
-            'bar_lengths': l,
-            'order_lengths': r
+            'status': solve_status(model),
+            'plan': solution_plan(X, m, n)
             }
     else:
         return {
@@ -0,0 +1,98 @@
+import argparse
+import hashlib
+import json
+import os
+import uuid
+import numpy as np
+
+# Cache of built models as compressed MPS files plus a JSON sidecar that maps
+# every variable group (X, WL, YLR, ...) back to its column indices. Entries are
+# keyed by formulation, instance and the parameters the builders use, so
+# reruns of the same instance skip Python model construction. Enabled with
+# params['model_cache'] = <directory>. The MPS files can also be solved offline,
+# e.g. with gurobi_cl.
+# Files are written under a temporary name and renamed into place, the sidecar
+# last, so workers sharing the directory never read a half-written entry.
+
+CACHE_VERSION = 1       # Bump whenever a build_* function or the file layout changes
+MODEL_KEYS = ['W', 'CC', 'CW', 'CR', 'BIGM', 'epsilon']    # Parameters that change the built model
+SUFFIX = ".mps.gz"
+
+
+def instance_key(name, params, l, r, q=None):
+    digest = hashlib.sha256()
+    digest.update(f"v{CACHE_VERSION}|{name}".encode())
+    digest.update(json.dumps({key: params.get(key) for key in MODEL_KEYS}, sort_keys=True).encode())
+    digest.update(np.asarray(l, dtype=np.float64).tobytes())
+    digest.update(b'|')
+    digest.update(np.asarray(r, dtype=np.float64).tobytes())
+    if q is not None:
+        digest.update(b'|')
+        digest.update(np.asarray(q, dtype=np.float64).tobytes())
+    return digest.hexdigest()[:32]
+
+
+def save_model(model, v, base):
+    model.update()                                      # Assigns the column indices
+    groups = {}
+    for group, variables in v.items():
+        keys = list(variables.keys())
+        groups[group] = {
+            'keys': [list(key) if isinstance(key, tuple) else key for key in keys],
+            'index': [variables[key].index for key in keys]
+            }
+    temp = f"{base}.{os.getpid()}.{uuid.uuid4().hex}"
+    model.write(temp + SUFFIX)                          # The suffix selects the file format
+    os.replace(temp + SUFFIX, base + SUFFIX)
+    with open(temp + ".json", 'w') as file:
+        json.dump({'name': model.ModelName, 'vars': groups}, file)
+    os.replace(temp + ".json", base + ".json")          # Entry is visible only once complete
+
+
+def load_model(base, env=None):
+    import gurobipy
+    model = gurobipy.read(base + SUFFIX, env=env) if env is not None else gurobipy.read(base + SUFFIX)
+    with open(base + ".json") as file:
+        meta = json.load(file)
+    columns = model.getVars()
+    v = {}
+    for group, entry in meta['vars'].items():
+        v[group] = {tuple(key) if isinstance(key, list) else key: columns[index]
+                    for key, index in zip(entry['keys'], entry['index'])}
+    return model, v
+
+
+def cached_build(name, build, params, n, m, l, r, run_id, env=None, q=None):
+    # build(params, n, m, l, r, run_id, env, q) -> (model, vars); through the cache if enabled
+    directory = params.get('model_cache')
+    if not directory:
+        return build(params, n, m, l, r, run_id, env, q)
+
+    base = os.path.join(directory, f"{name}_{instance_key(name, params, l, r, q)}")
+    if os.path.exists(base + ".json"):
+        return load_model(base, env)
+
+    model, v = build(params, n, m, l, r, run_id, env, q)
+    os.makedirs(directory, exist_ok=True)
+    save_model(model, v, base)
+    return model, v
+
+
+if __name__ == '__main__':
+    # Prebuilds the models of seeded instances, e.g. to solve them offline
+    from instances import DEFAULT_PARAMS, seeded_instances
+    from models import BATCH_MODELS
+
+    parser = argparse.ArgumentParser(description="Export built models to the MPS cache")
+    parser.add_argument('directory')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--models', nargs='+', choices=BATCH_MODELS, default=BATCH_MODELS)
+    args = parser.parse_args()
+
+    params = dict(DEFAULT_PARAMS, model_cache=args.directory)
+    for run_id, (n, m, l, r) in enumerate(seeded_instances(params, args.runs, args.seed), start=1):
+        for name in args.models:
+            module = __import__(name)
+            cached_build(name, getattr(module, f"build_{name}"), params, n, m, l, r, run_id)
+    print(f"Models written to '{args.directory}'")
@@ -0,0 +1,18 @@
+import importlib
+
+# Model name -> (module, function). Modules are only imported when a model is
+# requested, so worker processes and tools do not pay for unused ones.
+MODELS = {
+    'mo': ('mo', 'run_cso_mo'),
+    'm1': ('m1', 'run_cso_m1'),
+    'm2': ('m2', 'run_cso_m2'),
+    'm3': ('m3', 'run_cso_m3'),
+    'dive': ('dive', 'run_cso_dive')
+}
+
+BATCH_MODELS = ['mo', 'm1', 'm2', 'm3']                 # Models compared in a batch run
+
+
+def get_model(name):
+    module, func = MODELS[name]
+    return getattr(importlib.import_module(module), func)
@@ -0,0 +1,65 @@
+import numpy as np
+
+# Cutting plans as an m x n matrix X, X[i, j] = pieces of order i cut from bar j
+# (0/1 with one entry per piece, counts with a demand vector q).
+# Solver independent helpers shared by the heuristics.
+
+
+def plan_metrics(params, l, r, X, unused_waste=True, reusable_from=None):
+    # reusable_from: shortest leftover that is not waste, params['W'] by default
+    l = np.asarray(l)
+    r = np.asarray(r)
+    X = np.asarray(X)
+
+    load = r @ X                                        # Length cut from every bar
+    leftover = l - load
+    items = X.sum(axis=0)
+    used = items > 0
+
+    cuts = np.where(used, items - 1 + (leftover > 0), 0).sum()
+    reusable_from = params['W'] if reusable_from is None else reusable_from
+    waste_per_bar = np.where(leftover < reusable_from, leftover, 0)
+    if not unused_waste:                                # Waste only counted on cut bars
+        waste_per_bar = np.where(used, waste_per_bar, 0)
+    waste = waste_per_bar.sum()
+    used_bars = used.sum()
+
+    return {
+        'cuts': cuts,
+        'cuts_cost': cuts * params['CC'],
+        'waste': waste,
+        'waste_cost': waste * params['CW'],
+        'used_bars': used_bars,
+        'total_cost': cuts * params['CC'] + waste * params['CW']
+        }
+
+
+def greedy_repair(l, r, X, q=None):
+    # Completes a partial plan: every missing piece (longest first) goes to the
+    # tightest bar it still fits on, preferring bars that are already cut.
+    # Returns None if some piece does not fit anywhere, or if the partial plan
+    # already overfills a bar or cuts an order too often.
+    l = np.asarray(l)
+    r = np.asarray(r)
+    X = np.array(X, dtype=np.int64)
+    demand = np.ones(len(r), dtype=np.int64) if q is None else np.asarray(q)
+
+    residual = l - r @ X
+    used = X.sum(axis=0) > 0
+    missing = demand - X.sum(axis=1)
+    if (residual < 0).any() or (missing < 0).any():
+        return None
+
+    for i in np.argsort(-r, kind='stable'):
+        for _ in range(missing[i]):
+            fits = residual >= r[i]
+            if not fits.any():
+                return None
+            candidates = fits & used if (fits & used).any() else fits
+            slack = np.where(candidates, residual - r[i], np.inf)
+            j = int(np.argmin(slack))
+            X[i, j] += 1
+            residual[j] -= r[i]
+            used[j] = True
+
+    return X
@@ -0,0 +1,110 @@
+import cProfile
+import io
+import os
+import pstats
+import time
+import tracemalloc
+from collections import defaultdict
+
+# Stage timing for the runner and the model builders. Switched on with the
+# CSO_PROFILE environment variable (or enable()):
+#
+#   CSO_PROFILE=1            stage timers only
+#   CSO_PROFILE=cprofile     + cProfile hot spots per stage
+#   CSO_PROFILE=memory       + tracemalloc peak per stage
+#   (combine with commas, e.g. CSO_PROFILE=cprofile,memory)
+#
+# Usage inside a run:
+#   prof = profiling.start('modelO')
+#   ...build...;   prof.lap('build')
+#   ...solve...;   prof.lap('solve')
+
+_modes = set()
+_stats = defaultdict(lambda: {'calls': 0, 'time': 0.0, 'peak_memory': 0})    # (model, stage) -> totals
+_profiles = {}                                                                 # (model, stage) -> pstats
+_active = None          # Only one cProfile profiler can be enabled at a time
+
+
+def enable(modes='1'):
+    _modes.clear()
+    _modes.update(mode.strip() for mode in str(modes).split(',') if mode.strip() not in ('', '0'))
+    if 'memory' in _modes and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def enabled():
+    return bool(_modes)
+
+
+class _NoProfile:
+    def lap(self, stage):
+        pass
+
+
+class _StageProfile:
+    def __init__(self, model):
+        self.model = model
+        self._begin()
+
+    def _begin(self):
+        if 'memory' in _modes:
+            tracemalloc.reset_peak()
+        global _active
+        self.profiler = None
+        if 'cprofile' in _modes:
+            if _active is not None:                     # Tail of a profile that was never lapped
+                _active.disable()
+            self.profiler = _active = cProfile.Profile()
+            self.profiler.enable()
+        self.start = time.perf_counter()
+
+    def lap(self, stage):
+        # Closes the current stage under the given name and starts the next one
+        elapsed = time.perf_counter() - self.start
+        entry = _stats[self.model, stage]
+        entry['calls'] += 1
+        entry['time'] += elapsed
+        if 'memory' in _modes:
+            entry['peak_memory'] = max(entry['peak_memory'], tracemalloc.get_traced_memory()[1])
+        if self.profiler is not None:
+            self.profiler.disable()
+            key = (self.model, stage)
+            if key in _profiles:
+                _profiles[key].add(self.profiler)
+            else:
+                _profiles[key] = pstats.Stats(self.profiler)
+        self._begin()
+
+
+_NO_PROFILE = _NoProfile()
+
+
+def start(model):
+    return _StageProfile(model) if _modes else _NO_PROFILE
+
+
+def summary(top=10):
+    lines = ["model       stage        calls    total s     mean ms   peak MB"]
+    for (model, stage), entry in sorted(_stats.items(), key=lambda item: -item[1]['time']):
+        lines.append(f"{model:<11} {stage:<10} {entry['calls']:>7} {entry['time']:>10.3f} "
+                     f"{1000 * entry['time'] / entry['calls']:>11.3f} {entry['peak_memory'] / 2**20:>9.1f}")
+
+    for (model, stage), stats in _profiles.items():
+        stream = io.StringIO()
+        stats.stream = stream
+        stats.sort_stats('cumulative').print_stats(top)
+        lines.append(f"\n=== Hot spots: {model} / {stage} ===")
+        lines.append(stream.getvalue())
+    return "\n".join(lines)
+
+
+def write_summary(results_path, top=10):
+    # Writes the summary next to the results file, e.g. results.xlsx -> results.profile.txt
+    path = os.path.splitext(results_path)[0] + ".profile.txt"
+    with open(path, 'w') as file:
+        file.write(summary(top))
+    return path
+
+
+if os.environ.get('CSO_PROFILE'):
+    enable(os.environ['CSO_PROFILE'])
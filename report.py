@@ -0,0 +1,145 @@
+import argparse
+import numpy as np
+import pandas as pd
+from tuning import N_EDGES, M_EDGES
+
+# Comparison report over a results set (ResultStore .npz, or the results table
+# as .xlsx/.parquet/.csv): Dolan-More performance profiles, win/tie/loss
+# matrices and geometric-mean speedups per size bucket. Models are only
+# compared on runs that every one of them solved to optimality.
+
+METRICS = ['solve_time', 'total_cost']
+TIME_FLOOR = 1e-3       # Seconds; keeps ratios of near-zero solve times finite
+
+
+def load_results(path):
+    if path.endswith('.npz'):
+        from results_store import ResultStore
+        return ResultStore.load(path).to_dataframe()
+    if path.endswith('.xlsx'):
+        return pd.read_excel(path, sheet_name=0)
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def common_runs(df, metric, models=None, statuses=('optimal', 'optimal_by_bound')):
+    # runs x models matrix of a metric, restricted to runs all models solved
+    if 'status' in df and statuses:
+        df = df[df['status'].astype(str).isin(statuses)]
+    table = df.pivot_table(index='run', columns='model', values=metric, aggfunc='first', observed=True)
+    if models is not None:
+        table = table.reindex(columns=models)
+    return table.dropna()
+
+
+def performance_ratios(values, floor=0.0):
+    values = np.maximum(np.asarray(values, dtype=np.float64), floor)
+    best = values.min(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = np.where(best > 0, values / best, np.where(values <= best, 1.0, np.inf))
+    return ratios
+
+
+def performance_profile(values, taus=None, floor=0.0):
+    # rho[t, s] = share of runs on which model s is within factor taus[t] of the best
+    ratios = performance_ratios(values, floor)
+    if taus is None:
+        finite = ratios[np.isfinite(ratios)]
+        taus = np.unique(np.concatenate([[1.0], finite]))
+    ordered = np.sort(ratios, axis=0)
+    rho = np.stack([np.searchsorted(ordered[:, s], taus, side='right') for s in range(ratios.shape[1])], axis=1)
+    return taus, rho / max(len(ratios), 1)
+
+
+def win_tie_loss(values, rtol=1e-6):
+    # wins[a, b] = runs where model a is strictly better (lower) than model b
+    values = np.asarray(values, dtype=np.float64)
+    a = values[:, :, None]
+    b = values[:, None, :]
+    tol = rtol * np.maximum(np.maximum(np.abs(a), np.abs(b)), 1.0)
+    wins = (a < b - tol).sum(axis=0)
+    ties = (np.abs(a - b) <= tol).sum(axis=0)
+    return wins, ties, len(values) - wins - ties
+
+
+def size_buckets(bars, orders):
+    # Vectorized tuning.size_bucket labels
+    n_labels = np.array([str(edge) for edge in N_EDGES] + ['inf'])
+    m_labels = np.array([str(edge) for edge in M_EDGES] + ['inf'])
+    n_index = np.searchsorted(N_EDGES, bars, side='left')
+    m_index = np.searchsorted(M_EDGES, orders, side='left')
+    return np.char.add(np.char.add('n', n_labels[n_index]), np.char.add('_m', m_labels[m_index]))
+
+
+def bucket_speedups(df, reference, models=None, floor=TIME_FLOOR):
+    # Geometric mean of reference time / model time per size bucket
+    times = common_runs(df, 'solve_time', models)
+    sizes = df.groupby('run')[['bars', 'orders']].first().reindex(times.index)
+    log_speedup = np.log(np.maximum(times[[reference]].to_numpy(), floor)) - np.log(np.maximum(times.to_numpy(), floor))
+    frame = pd.DataFrame(log_speedup, index=times.index, columns=times.columns)
+    frame['bucket'] = size_buckets(sizes['bars'].to_numpy(), sizes['orders'].to_numpy())
+    grouped = frame.groupby('bucket')
+    speedups = np.exp(grouped.mean())
+    speedups['runs'] = grouped.size()
+    return speedups
+
+
+def build_report(df, models=None, reference=None):
+    models = models or [str(model) for model in pd.unique(df['model'].astype(str))]
+    reference = reference or models[0]
+    sheets = {}
+    for metric in METRICS:
+        table = common_runs(df, metric, models)
+        floor = TIME_FLOOR if metric == 'solve_time' else 0.0
+        taus, rho = performance_profile(table.to_numpy(), floor=floor)
+        sheets[f"profile_{metric}"] = pd.DataFrame(rho, columns=models).assign(tau=taus).set_index('tau')
+
+        wins, ties, losses = win_tie_loss(table.to_numpy())
+        cells = np.char.add(np.char.add(np.char.add(wins.astype(str), '/'),
+                                        np.char.add(ties.astype(str), '/')), losses.astype(str))
+        sheets[f"wtl_{metric}"] = pd.DataFrame(cells, index=models, columns=models)
+    sheets['speedup'] = bucket_speedups(df, reference, models)
+    sheets['summary'] = pd.DataFrame({'runs_compared': [len(common_runs(df, 'solve_time', models))],
+                                      'reference': [reference]})
+    return sheets
+
+
+def write_report(sheets, output, plot=True):
+    with pd.ExcelWriter(output) as writer:
+        for name, frame in sheets.items():
+            frame.to_excel(writer, sheet_name=name)
+
+    if plot:
+        try:
+            import matplotlib
+            matplotlib.use('Agg')
+            import matplotlib.pyplot as plt
+        except ImportError:
+            return
+        fig, axes = plt.subplots(1, len(METRICS), figsize=(6 * len(METRICS), 4))
+        for axis, metric in zip(np.atleast_1d(axes), METRICS):
+            profile = sheets[f"profile_{metric}"]
+            for model in profile.columns:
+                axis.step(profile.index, profile[model], where='post', label=model)
+            axis.set_xscale('log')
+            axis.set_xlabel('tau')
+            axis.set_ylabel('share of runs')
+            axis.set_title(f"Performance profile: {metric}")
+            axis.legend()
+        fig.tight_layout()
+        fig.savefig(output.rsplit('.', 1)[0] + ".png")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Performance profile comparison of the formulations")
+    parser.add_argument('results', help="ResultStore .npz or results table (.xlsx/.parquet/.csv)")
+    parser.add_argument('--output', default="comparison_report.xlsx")
+    parser.add_argument('--models', nargs='+', default=None, help="model names, e.g. modelO model1 model2 model3")
+    parser.add_argument('--reference', default=None, help="model the speedups are measured against")
+    parser.add_argument('--no-plot', action='store_true')
+    args = parser.parse_args()
+
+    sheets = build_report(load_results(args.results), args.models, args.reference)
+    write_report(sheets, args.output, plot=not args.no_plot)
+    print(f"Compared {sheets['summary']['runs_compared'][0]} runs, report saved to '{args.output}'")
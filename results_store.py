@@ -0,0 +1,146 @@
+import numpy as np
+
+# Columnar store for batch results. Every column is a preallocated NumPy array
+# that grows by doubling; the model and status names are small integer codes.
+# Instance data (bar and order lengths) is kept once per run id in flat arrays
+# with offsets, instead of once per model row.
+
+FLOAT_COLUMNS = ['cuts', 'cuts_cost', 'waste', 'waste_cost', 'used_bars', 'total_cost', 'solve_time',
+                 'lower_bound', 'gap']
+MODEL_NAMES = ['modelO', 'model1', 'model2', 'model3', 'dive']
+STATUS_NAMES = ['optimal', 'time_limit', 'infeasible', 'heuristic', 'optimal_by_bound']
+
+
+def _grow(array, size):
+    grown = np.empty(max(size, 2 * len(array)), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class ResultStore:
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.run = np.zeros(capacity, dtype=np.int64)
+        self.model = np.zeros(capacity, dtype=np.int8)
+        self.status = np.zeros(capacity, dtype=np.int8)
+        self.values = {column: np.full(capacity, np.nan) for column in FLOAT_COLUMNS}
+
+        self.instance_run = []
+        self.instance_bars = []
+        self.instance_orders = []
+        self.bar_lengths = []                           # Per instance arrays, concatenated on export
+        self.order_lengths = []
+        self.order_quantities = []
+
+    def __len__(self):
+        return self.size
+
+    def add_instance(self, run_id, l, r, q=None):
+        self.instance_run.append(run_id)
+        self.instance_bars.append(len(l))
+        self.instance_orders.append(len(r))
+        self.bar_lengths.append(np.asarray(l, dtype=np.int64))
+        self.order_lengths.append(np.asarray(r, dtype=np.int64))
+        self.order_quantities.append(np.ones(len(r), dtype=np.int64) if q is None else np.asarray(q, dtype=np.int64))
+
+    def add(self, result):
+        # Numeric fields of a run_cso_* result dict; arrays and plans are dropped
+        if self.size == len(self.run):
+            self.run = _grow(self.run, self.size + 1)
+            self.model = _grow(self.model, self.size + 1)
+            self.status = _grow(self.status, self.size + 1)
+            for column in FLOAT_COLUMNS:
+                grown = _grow(self.values[column], self.size + 1)
+                grown[self.size:] = np.nan
+                self.values[column] = grown
+
+        k = self.size
+        self.run[k] = result['run']
+        self.model[k] = MODEL_NAMES.index(result['model'])
+        self.status[k] = STATUS_NAMES.index(result.get('status', 'heuristic'))
+        for column in FLOAT_COLUMNS:
+            if column in result:
+                self.values[column][k] = result[column]
+        self.size += 1
+
+    def columns(self):
+        columns = {'run': self.run[:self.size], 'model': self.model[:self.size], 'status': self.status[:self.size]}
+        columns.update({column: values[:self.size] for column, values in self.values.items()})
+        return columns
+
+    def instance_columns(self):
+        return {
+            'run': np.array(self.instance_run, dtype=np.int64),
+            'bars': np.array(self.instance_bars, dtype=np.int64),
+            'orders': np.array(self.instance_orders, dtype=np.int64),
+            'bar_lengths': np.concatenate(self.bar_lengths) if self.bar_lengths else np.zeros(0, dtype=np.int64),
+            'order_lengths': np.concatenate(self.order_lengths) if self.order_lengths else np.zeros(0, dtype=np.int64),
+            'order_quantities': (np.concatenate(self.order_quantities) if self.order_quantities
+                                 else np.zeros(0, dtype=np.int64))
+            }
+
+    def instance(self, run_id):
+        # (l, r, q) of one run
+        k = self.instance_run.index(run_id)
+        return self.bar_lengths[k], self.order_lengths[k], self.order_quantities[k]
+
+    def to_dataframe(self):
+        # One row per (run, model) with numeric dtypes, bars and orders joined from the instances
+        import pandas as pd
+        columns = self.columns()
+        df = pd.DataFrame({column: values for column, values in columns.items() if column not in ('model', 'status')})
+        df.insert(1, 'model', pd.Categorical.from_codes(columns['model'], MODEL_NAMES))
+        df.insert(2, 'status', pd.Categorical.from_codes(columns['status'], STATUS_NAMES))
+        sizes = pd.DataFrame({key: values for key, values in self.instance_columns().items()
+                              if key in ('run', 'bars', 'orders')})
+        return df.merge(sizes, on='run', how='left')
+
+    def instances_dataframe(self):
+        import pandas as pd
+        return pd.DataFrame({
+            'run': self.instance_run,
+            'bars': self.instance_bars,
+            'orders': self.instance_orders,
+            'bar_lengths': [" ".join(map(str, l)) for l in self.bar_lengths],
+            'order_lengths': [" ".join(map(str, r)) for r in self.order_lengths],
+            'order_quantities': [" ".join(map(str, q)) for q in self.order_quantities]
+            })
+
+    def save(self, path):
+        # .npz keeps everything numeric; .xlsx adds an 'instances' sheet; .parquet/.csv the results only
+        if path.endswith('.npz'):
+            instances = {f"instance_{key}": values for key, values in self.instance_columns().items()}
+            np.savez_compressed(path, **self.columns(), **instances)
+        elif path.endswith('.xlsx'):
+            import pandas as pd
+            with pd.ExcelWriter(path) as writer:
+                self.to_dataframe().to_excel(writer, sheet_name='results', index=False)
+                self.instances_dataframe().to_excel(writer, sheet_name='instances', index=False)
+        elif path.endswith('.parquet'):
+            self.to_dataframe().to_parquet(path, index=False)
+        else:
+            self.to_dataframe().to_csv(path, index=False)
+
+    @classmethod
+    def load(cls, path):
+        # Reads a store written by save(path) as .npz
+        data = np.load(path)
+        store = cls(capacity=max(1, len(data['run'])))
+        store.size = len(data['run'])
+        store.run[:store.size] = data['run']
+        store.model[:store.size] = data['model']
+        store.status[:store.size] = data['status']
+        for column in FLOAT_COLUMNS:
+            store.values[column][:store.size] = data[column]
+
+        if len(data['instance_run']) == 0:
+            return store
+        bars_offsets = np.cumsum(data['instance_bars'])[:-1]
+        orders_offsets = np.cumsum(data['instance_orders'])[:-1]
+        store.instance_run = data['instance_run'].tolist()
+        store.instance_bars = data['instance_bars'].tolist()
+        store.instance_orders = data['instance_orders'].tolist()
+        store.bar_lengths = np.split(data['instance_bar_lengths'], bars_offsets)
+        store.order_lengths = np.split(data['instance_order_lengths'], orders_offsets)
+        store.order_quantities = np.split(data['instance_order_quantities'], orders_offsets)
+        return store
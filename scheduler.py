@@ -0,0 +1,116 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from instances import DEFAULT_PARAMS, seeded_instances
+from models import BATCH_MODELS, get_model
+
+# Parallel batch execution without oversubscription: each instance gets a Gurobi
+# Threads setting from its size, and instances with the same setting run on
+# cores // threads worker processes. Every worker process owns one Gurobi Env
+# that all its models share.
+
+THREAD_CLASSES = [      # (max n * m, Threads)
+    (500, 1),
+    (5000, 2),
+    (50000, 4)
+]
+MAX_THREADS = 8
+
+_env = None             # Per-process Gurobi environment
+
+
+def threads_for(n, m, cores):
+    size = n * m
+    for limit, threads in THREAD_CLASSES:
+        if size <= limit:
+            return min(threads, cores)
+    return min(MAX_THREADS, cores)
+
+
+def plan_schedule(jobs, cores):
+    # Groups jobs by Threads setting -> {threads: (workers, [jobs])}
+    groups = {}
+    for job in jobs:
+        threads = threads_for(job['n'], job['m'], cores)
+        groups.setdefault(threads, []).append(job)
+    return {threads: (max(1, cores // threads), group) for threads, group in sorted(groups.items())}
+
+
+def init_worker():
+    global _env
+    import gurobipy
+    _env = gurobipy.Env(empty=True)
+    _env.setParam('OutputFlag', 0)
+    _env.start()
+
+
+def worker_env():
+    return _env
+
+
+def _solve(job, params, threads):
+    model_func = get_model(job['model'])
+    params = dict(params, Threads=threads)
+    try:
+        return model_func(params, job['n'], job['m'], job['l'], job['r'], job['run'], env=_env)
+    except Exception as error:
+        return {'run': job['run'], 'model': job['model'], 'status': 'error', 'error': repr(error)}
+
+
+def run_scheduled(jobs, params, cores=None):
+    cores = cores or os.cpu_count() or 1
+    results = []
+    groups = []
+
+    start_time = time.time()
+    for threads, (workers, group) in plan_schedule(jobs, cores).items():
+        group_start = time.time()
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+            group_results = list(pool.map(_solve, group, [params] * len(group), [threads] * len(group)))
+        group_time = time.time() - group_start
+
+        results.extend(group_results)
+        groups.append({
+            'threads': threads,
+            'workers': workers,
+            'runs': len(group),
+            'wall_time': group_time,
+            'runs_per_core_second': len(group) / (group_time * workers * threads)
+            })
+    wall_time = time.time() - start_time
+
+    solve_time = sum(result.get('solve_time', 0) for result in results)
+    report = {
+        'cores': cores,
+        'runs': len(results),
+        'wall_time': wall_time,
+        'solve_time': solve_time,
+        'runs_per_core_second': len(results) / (wall_time * cores),
+        'groups': groups
+        }
+    return results, report
+
+
+def batch_jobs(params, num_runs, seed=0, models=BATCH_MODELS):
+    jobs = []
+    for run_id, (n, m, l, r) in enumerate(seeded_instances(params, num_runs, seed), start=1):
+        for name in models:
+            jobs.append({'run': run_id, 'model': name, 'n': n, 'm': m, 'l': l, 'r': r})
+    return jobs
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Core-aware parallel batch of run_cso_* calls")
+    parser.add_argument('--runs', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cores', type=int, default=None)
+    args = parser.parse_args()
+
+    results, report = run_scheduled(batch_jobs(DEFAULT_PARAMS, args.runs, args.seed), DEFAULT_PARAMS, args.cores)
+
+    print(f"Runs: {report['runs']} on {report['cores']} cores in {report['wall_time']:.2f} s")
+    print(f"Throughput: {report['runs_per_core_second']:.3f} runs per core-second")
+    for group in report['groups']:
+        print(f"  Threads={group['threads']} x {group['workers']} workers: {group['runs']} runs, "
+              f"{group['wall_time']:.2f} s, {group['runs_per_core_second']:.3f} runs per core-second")
@@ -0,0 +1,229 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from instances import DEFAULT_PARAMS
+from models import MODELS, get_model
+from scheduler import init_worker, threads_for, worker_env
+
+# Local cutting optimization service (HTTP over TCP or a Unix socket).
+#
+#   POST /solve    {"model": "mo", "l": [...], "r": [...], "deadline": 30, "params": {...}}
+#   GET  /metrics  request counters, queue depth and latency percentiles
+#
+# Requests for the same stock pool (model, bar lengths, parameter overrides)
+# arriving within BATCH_WINDOW are coalesced into one solve over all their
+# orders, so concurrent requests cannot be planned onto the same bar twice. Each
+# request gets the bar index of every one of its orders back. If the merged
+# solve is infeasible, the requests are solved one after another in arrival
+# order, each on the bars the previous ones left uncut. Every solve gets a Gurobi
+# Threads setting so that the worker processes together use at most all cores.
+
+BATCH_WINDOW = 0.05     # Seconds to wait for more requests on the same stock pool
+DEFAULT_DEADLINE = 60   # Seconds per request if none is given
+MAX_QUEUE = 256         # Requests waiting or solving before new ones are rejected
+LATENCY_WINDOW = 10000  # Latencies kept for the percentiles
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 422: 'Unprocessable Entity',
+           500: 'Internal Server Error', 503: 'Service Unavailable', 504: 'Gateway Timeout'}
+
+
+def _solve_batch(name, params, l, r, time_limit):
+    params = dict(params, TimeLimit=time_limit)
+    l = np.asarray(l)
+    r = np.asarray(r)
+    return get_model(name)(params, len(l), len(r), l, r, 0, env=worker_env())
+
+
+def _plan_response(result, offset, count, batch_size, bars=None):
+    # bars: indices into the request's bar list if the solve only saw a subset
+    if result.get('status') in ('infeasible', 'error'):
+        return 422, {'status': 'infeasible', 'model': result['model']}
+    plan = result['plan'][offset:offset + count]
+    assignment = plan.argmax(axis=1)
+    if bars is not None:
+        assignment = np.asarray(bars)[assignment]
+    return 200, {
+        'status': result.get('status', 'feasible'),
+        'model': result['model'],
+        'assignment': assignment.tolist(),             # Bar index of every order
+        'batch_size': batch_size,
+        'batch': {key: float(result[key]) for key in ('cuts', 'waste', 'used_bars', 'total_cost', 'solve_time')}
+        }
+
+
+class CuttingService:
+    def __init__(self, params=DEFAULT_PARAMS, workers=None, batch_window=BATCH_WINDOW, max_queue=MAX_QUEUE):
+        self.params = params
+        self.batch_window = batch_window
+        self.max_queue = max_queue
+        self.cores = os.cpu_count() or 1
+        self.workers = workers or self.cores
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker)
+        self.pending = {}                               # Stock pool key -> [(orders, deadline, future)]
+        self.flushes = set()                            # Running _flush tasks, referenced until done
+        self.in_flight = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.counters = {'requests': 0, 'batches': 0, 'coalesced': 0, 'errors': 0, 'timeouts': 0, 'rejected': 0}
+
+    def queue_depth(self):
+        return sum(len(entries) for entries in self.pending.values()) + self.in_flight
+
+    async def solve(self, request):
+        if not isinstance(request, dict):
+            return 400, {'error': "request body must be a JSON object"}
+        name = request.get('model', 'mo')
+        if name not in MODELS or not request.get('l') or not request.get('r'):
+            return 400, {'error': "model, l and r are required"}
+        if not isinstance(request.get('params', {}), dict):
+            return 400, {'error': "params must be a JSON object"}
+        if self.queue_depth() >= self.max_queue:
+            self.counters['rejected'] += 1
+            return 503, {'error': "queue full"}
+
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + float(request.get('deadline', DEFAULT_DEADLINE))
+        key = (name, tuple(request['l']), json.dumps(request.get('params', {}), sort_keys=True))
+        future = loop.create_future()
+
+        entries = self.pending.get(key)
+        if entries is None:
+            entries = self.pending[key] = []
+            loop.call_later(self.batch_window, self._start_flush, key)
+        entries.append((list(request['r']), deadline, future))
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=max(0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            self.counters['timeouts'] += 1
+            return 504, {'error': "deadline exceeded"}
+
+    def _start_flush(self, key):
+        task = asyncio.ensure_future(self._flush(key))
+        self.flushes.add(task)
+        task.add_done_callback(self.flushes.discard)
+
+    async def _run(self, name, params, l, r, deadline):
+        remaining = deadline - time.monotonic()
+        time_limit = max(remaining - min(1.0, 0.1 * remaining), 0.01)    # Leave time to return the incumbent
+        if not params.get('Threads'):                   # Share the cores among the worker processes
+            params = dict(params, Threads=min(threads_for(len(l), len(r), self.cores),
+                                              max(1, self.cores // self.workers)))
+        pool = self.pool
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, _solve_batch, name, params, l, r, time_limit)
+        except BrokenProcessPool:
+            if self.pool is pool:                       # A worker died: later requests get a fresh pool
+                self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker)
+                pool.shutdown(wait=False)
+            raise
+
+    async def _flush(self, key):
+        entries = self.pending.pop(key)
+        name, l, overrides = key
+        deadline = min(entry[1] for entry in entries)
+
+        self.counters['batches'] += 1
+        self.counters['coalesced'] += len(entries) - 1
+        self.in_flight += len(entries)
+        try:
+            params = dict(self.params, **json.loads(overrides))
+            result = await self._run(name, params, list(l), sum((entry[0] for entry in entries), []), deadline)
+            if result.get('status') == 'infeasible' and len(entries) > 1:
+                responses = await self._solve_sequentially(name, params, l, entries)
+            else:
+                responses = []
+                offset = 0
+                for entry in entries:
+                    responses.append(_plan_response(result, offset, len(entry[0]), len(entries)))
+                    offset += len(entry[0])
+        except Exception as error:
+            self.counters['errors'] += 1
+            responses = [(500, {'error': repr(error)})] * len(entries)
+        finally:
+            self.in_flight -= len(entries)
+
+        for entry, response in zip(entries, responses):
+            if not entry[2].done():
+                entry[2].set_result(response)
+
+    async def _solve_sequentially(self, name, params, l, entries):
+        # Arrival order; bars cut for one request are not offered to the next
+        free = list(range(len(l)))
+        responses = []
+        for orders, deadline, _ in entries:
+            if not free:
+                responses.append((422, {'status': 'infeasible', 'model': name}))
+                continue
+            result = await self._run(name, params, [l[j] for j in free], orders, deadline)
+            responses.append(_plan_response(result, 0, len(orders), 1, bars=free))
+            if result.get('status') not in ('infeasible', 'error'):
+                cut = result['plan'].sum(axis=0) > 0
+                free = [j for j, used in zip(free, cut) if not used]
+        return responses
+
+    def metrics(self):
+        latencies = np.array(self.latencies) if self.latencies else np.zeros(1)
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000
+        return dict(self.counters, queue_depth=self.queue_depth(), in_flight=self.in_flight,
+                    latency_ms={'p50': p50, 'p90': p90, 'p99': p99})
+
+    async def handle(self, reader, writer):
+        start_time = time.monotonic()
+        try:
+            method, path, _ = (await reader.readline()).decode().split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode().strip()
+                if not line:
+                    break
+                field, _, value = line.partition(':')
+                headers[field.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+            if method == 'POST' and path == '/solve':
+                self.counters['requests'] += 1
+                try:
+                    code, response = await self.solve(json.loads(body or b'{}'))
+                except (ValueError, TypeError) as error:
+                    code, response = 400, {'error': repr(error)}
+                self.latencies.append(time.monotonic() - start_time)
+            elif method == 'GET' and path == '/metrics':
+                code, response = 200, self.metrics()
+            else:
+                code, response = 404, {'error': f"no route {method} {path}"}
+        except (ValueError, asyncio.IncompleteReadError):
+            code, response = 400, {'error': "malformed request"}
+
+        payload = json.dumps(response).encode()
+        writer.write(f"HTTP/1.1 {code} {REASONS[code]}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode() + payload)
+        await writer.drain()
+        writer.close()
+
+
+async def serve(host='127.0.0.1', port=8080, unix=None, workers=None, batch_window=BATCH_WINDOW):
+    service = CuttingService(workers=workers, batch_window=batch_window)
+    if unix:
+        server = await asyncio.start_unix_server(service.handle, path=unix)
+    else:
+        server = await asyncio.start_server(service.handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Local cutting optimization service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--unix', default=None, help="serve on a Unix socket path instead of TCP")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--batch-window', type=float, default=BATCH_WINDOW)
+    args = parser.parse_args()
+
+    asyncio.run(serve(args.host, args.port, args.unix, args.workers, args.batch_window))
@@ -0,0 +1,58 @@
+from gurobipy import GRB
+import numpy as np
+import tuning
+
+# Shared solver handling of the run_cso_* functions
+
+STATUS_NAMES = {
+    GRB.OPTIMAL: 'optimal',
+    GRB.TIME_LIMIT: 'time_limit',
+    GRB.USER_OBJ_LIMIT: 'optimal_by_bound'      # Incumbent reached the lower bound of bounds.py
+}
+
+
+def configure_model(model, params, name=None, n=None, m=None):
+    model.setParam('OutputFlag', 0)  # Disable(0) / enable(1) detailed solver output
+
+    # Tuned settings for the formulation and size class (tuning.py), then
+    # explicit overrides from params['solver_params']
+    if name is not None:
+        for key, value in tuning.tuned_params(params, name, n, m).items():
+            model.setParam(key, value)
+    for key, value in params.get('solver_params', {}).items():
+        model.setParam(key, value)
+
+    if params.get('Threads'):                           # Set by scheduler.py, default: all cores
+        model.setParam('Threads', params['Threads'])
+    if params.get('TimeLimit'):                         # Deadline in seconds, e.g. from service.py
+        model.setParam('TimeLimit', params['TimeLimit'])
+
+
+def assignment_vars(model, m, n, l, r, q=None):
+    # One binary per piece, or with a demand vector q (r holds distinct lengths)
+    # an integer count per order type and bar, bounded by demand and bar length
+    if q is None:
+        return model.addVars(m, n, vtype=GRB.BINARY, name="X")
+    ub = {(i, j): min(int(q[i]), int(l[j] // r[i])) for i in range(m) for j in range(n)}
+    return model.addVars(m, n, vtype=GRB.INTEGER, lb=0, ub=ub, name="X")
+
+
+def order_demand(m, q=None):
+    return [1] * m if q is None else [int(value) for value in q]
+
+
+def has_solution(model):
+    # Optimal (also by bound), or stopped by a limit with an incumbent to report
+    return model.status == GRB.OPTIMAL or (model.status in STATUS_NAMES and model.SolCount > 0)
+
+
+def solve_status(model):
+    return STATUS_NAMES.get(model.status, 'infeasible')
+
+
+def solution_plan(X, m, n):
+    # Assignment matrix of the incumbent, plan[i, j] = pieces of order i cut from bar j
+    plan = np.zeros((m, n), dtype=np.int64)
+    for (i, j), var in X.items():
+        plan[i, j] = round(var.X)
+    return plan
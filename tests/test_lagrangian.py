@@ -0,0 +1,81 @@
+import itertools
+import numpy as np
+import pytest
+from bounds import combinatorial_bounds
+from lagrangian import attach_bound, lagrangian_bound, optimality_gap
+from plan import plan_metrics
+
+PARAMS = {'W': 45, 'CC': 400, 'CW': 100}
+
+
+def brute_force_mo(params, l, r):
+    # Optimal own-model objective (total cost plus used bars) over all assignments
+    best = None
+    for bars in itertools.product(range(len(l)), repeat=len(r)):
+        X = np.zeros((len(r), len(l)), dtype=np.int64)
+        X[np.arange(len(r)), bars] = 1
+        if (r @ X > l).any():
+            continue
+        figures = plan_metrics(params, l, r, X)
+        objective = figures['total_cost'] + figures['used_bars']
+        best = objective if best is None else min(best, objective)
+    return best
+
+
+def small_instances(count=25, seed=0):
+    rng = np.random.RandomState(seed)
+    for _ in range(count):
+        n = rng.randint(2, 4)
+        m = rng.randint(2, 6)
+        yield n, m, rng.randint(PARAMS['W'], 300, size=n), rng.randint(1, 300, size=m)
+
+
+@pytest.mark.parametrize('instance', list(small_instances()))
+def test_bounds_below_brute_force_optimum(instance):
+    n, m, l, r = instance
+    optimum = brute_force_mo(PARAMS, l, r)
+    bounds = combinatorial_bounds(PARAMS, l, r)
+    if bounds is None:                                  # Only claimed for infeasible instances
+        assert optimum is None
+        return
+    if optimum is None:
+        pytest.skip("infeasible instance the combinatorial check does not catch")
+    assert bounds['objective']['mo'] <= optimum + 1e-6
+    assert lagrangian_bound(PARAMS, n, m, l, r)['lower_bound'] <= optimum + 1e-6
+    assert lagrangian_bound(PARAMS, n, m, l, r, upper_bound=optimum)['lower_bound'] <= optimum + 1e-6
+
+
+def test_infeasible_instance_has_no_combinatorial_bounds():
+    assert combinatorial_bounds(PARAMS, [100, 100], [150]) is None
+    assert combinatorial_bounds(PARAMS, [100, 100], [80, 80, 80]) is None
+
+
+def test_min_bars_covers_total_length():
+    bounds = combinatorial_bounds(PARAMS, [100, 100, 100], [60, 60, 60])
+    assert bounds['min_bars'] == 2
+
+
+def test_demand_vector_matches_expanded_orders():
+    l = np.array([120, 100, 90])
+    r = np.array([30, 45])
+    q = np.array([3, 2])
+    expanded = np.repeat(r, q)
+    optimum = brute_force_mo(PARAMS, l, expanded)
+    bound = lagrangian_bound(PARAMS, len(l), len(r), l, r, q=q)['lower_bound']
+    assert bound <= optimum + 1e-6
+    assert combinatorial_bounds(PARAMS, l, r, q)['objective']['mo'] <= optimum + 1e-6
+
+
+def test_non_integer_lengths_are_rejected():
+    with pytest.raises(ValueError):
+        lagrangian_bound(PARAMS, 2, 2, [100, 100], [30.5, 40])
+
+
+def test_attach_bound_reports_gap():
+    l = np.array([100, 100])
+    r = np.array([60, 40, 30])
+    optimum = brute_force_mo(PARAMS, l, r)
+    result = {'status': 'optimal', 'total_cost': optimum - 2, 'used_bars': 2}
+    attach_bound(result, PARAMS, len(l), len(r), l, r)
+    assert result['lower_bound'] <= optimum + 1e-6
+    assert result['gap'] == optimality_gap(optimum, result['lower_bound'])
@@ -0,0 +1,79 @@
+import numpy as np
+from plan import plan_metrics
+from validate import reusable_from, validate_plan, validate_result
+
+PARAMS = {'W': 45, 'CC': 400, 'CW': 100, 'CR': 200, 'epsilon': 1e-3}
+
+L = np.array([300, 250, 200])
+R = np.array([120, 100, 90, 80])
+PLAN = np.array([[1, 0, 0],
+                 [1, 0, 0],
+                 [0, 1, 0],
+                 [0, 0, 1]])
+
+
+def result_for(model, plan=PLAN, params=PARAMS, **figures):
+    unused = model in ('modelO', 'dive', 'model1')
+    result = dict(plan_metrics(params, L, R, plan, unused_waste=unused,
+                               reusable_from=reusable_from(params, model)),
+                  model=model, status='optimal', plan=plan)
+    result.update(figures)
+    return result
+
+
+def test_consistent_results_pass():
+    for model in ('modelO', 'model1', 'model2', 'model3', 'dive'):
+        assert validate_result(PARAMS, L, R, result_for(model)) == []
+
+
+def test_order_cut_twice_and_missing():
+    plan = PLAN.copy()
+    plan[0] = [1, 1, 0]
+    plan[3] = [0, 0, 0]
+    problems = validate_plan(PARAMS, L, R, plan)
+    assert any("orders [0, 3]" in problem for problem in problems)
+
+
+def test_overfilled_bar():
+    plan = PLAN.copy()
+    plan[2] = [1, 0, 0]
+    problems = validate_plan(PARAMS, L, R, plan)
+    assert any("bars [0]" in problem for problem in problems)
+
+
+def test_fractional_and_shape():
+    assert validate_plan(PARAMS, L, R, PLAN * 0.5)[0] == "plan has negative or fractional entries"
+    assert "does not match" in validate_plan(PARAMS, L, R, PLAN[:, :2])[0]
+
+
+def test_wrong_reported_figures():
+    problems = validate_result(PARAMS, L, R, result_for('model2', cuts=0))
+    assert problems == [f"cuts reported 0 but plan gives {result_for('model2')['cuts']}"]
+
+
+def test_wrong_demand_length_is_a_problem():
+    problems = validate_plan(PARAMS, L, R, PLAN, q=[1, 1])
+    assert problems == ["demand shape (2,) does not match 4 orders"]
+
+
+def test_missing_plan():
+    assert validate_result(PARAMS, L, R, {'model': 'model2', 'status': 'optimal'}) == ["result has no plan"]
+
+
+def test_m3_keeps_leftovers_as_waste_when_retail_costs_more():
+    # Leftovers 80, 160 and 120: all retail for CR = 200, only 160 for CR = 13000
+    params = dict(PARAMS, CR=13000)
+    cheap = result_for('model3')
+    expensive = result_for('model3', params=params)
+    assert cheap['waste'] == 0
+    assert expensive['waste'] == 80 + 120
+    assert validate_result(params, L, R, expensive) == []
+    assert validate_result(params, L, R, cheap) != []
+
+
+def test_m1_reuses_leftovers_from_w_plus_epsilon():
+    l = np.array([145, 300])
+    r = np.array([100])
+    plan = np.array([[1, 0]])
+    figures = plan_metrics(PARAMS, l, r, plan, reusable_from=reusable_from(PARAMS, 'model1'))
+    assert figures['waste'] == 45
@@ -0,0 +1,87 @@
+import json
+import threading
+import time
+import numpy as np
+from instances import DEFAULT_PARAMS
+from plan import plan_metrics
+from workqueue import _heartbeat, claim, collect, connect, finish, init_queue, progress
+
+
+def fake_model(params, n, m, l, r, run_id):
+    # Every order on its own bar if it fits, in place of a Gurobi solve
+    l, r = np.asarray(l), np.asarray(r)
+    if m > n or (r > l.max()).any():
+        return {'run': run_id, 'model': 'modelO', 'status': 'infeasible'}
+    plan = np.zeros((m, n), dtype=np.int64)
+    plan[np.arange(m), np.argsort(-l)[np.argsort(np.argsort(-r))]] = 1
+    if (r @ plan > l).any():
+        return {'run': run_id, 'model': 'modelO', 'status': 'infeasible'}
+    return dict(plan_metrics(params, l, r, plan), run=run_id, model='modelO', status='optimal')
+
+
+def queue(tmp_path, runs=2):
+    path = str(tmp_path / "queue.db")
+    init_queue(path, DEFAULT_PARAMS, runs, seed=0, models=['mo'])
+    return path, connect(path)
+
+
+def test_expired_lease_is_reclaimed_and_old_owner_cannot_write(tmp_path):
+    path, conn = queue(tmp_path)
+    first = claim(conn, 'a', lease=-1)                  # Lease already expired
+    second = claim(conn, 'b')
+    assert first[0] == second[0]
+    assert not finish(conn, first[0], 'a', result={'run': 1})
+    assert finish(conn, second[0], 'b', result={'run': 1})
+    assert conn.execute("SELECT attempts, worker FROM jobs WHERE id = ?", (first[0],)).fetchone() == (2, 'b')
+
+
+def test_job_fails_after_max_attempts(tmp_path):
+    path, conn = queue(tmp_path, runs=1)
+    for _ in range(2):
+        assert claim(conn, 'a', lease=-1, max_attempts=2) is not None
+    assert claim(conn, 'b', max_attempts=2) is None
+    assert progress(path) == {'failed': 1}
+
+
+def test_error_requeues_until_max_attempts(tmp_path):
+    path, conn = queue(tmp_path, runs=1)
+    job = claim(conn, 'a', max_attempts=2)
+    assert finish(conn, job[0], 'a', error="boom", max_attempts=2)
+    assert progress(path) == {'pending': 1}
+    job = claim(conn, 'a', max_attempts=2)
+    assert finish(conn, job[0], 'a', error="boom", max_attempts=2)
+    assert progress(path) == {'failed': 1}
+
+
+def test_heartbeat_keeps_the_lease(tmp_path):
+    path, conn = queue(tmp_path, runs=1)
+    job = claim(conn, 'a', lease=0.3)
+    stop = threading.Event()
+    beat = threading.Thread(target=_heartbeat, args=(path, job[0], 'a', 0.3, stop))
+    beat.start()
+    time.sleep(0.6)
+    try:
+        assert claim(conn, 'b', lease=0.3) is None
+    finally:
+        stop.set()
+        beat.join()
+    time.sleep(0.4)
+    assert claim(conn, 'b')[0] == job[0]
+
+
+def test_collect_builds_result_store(tmp_path):
+    path, conn = queue(tmp_path, runs=3)
+    while True:
+        job = claim(conn, 'a')
+        if job is None:
+            break
+        job_id, run_id, name, instance = job
+        data = json.loads(instance)
+        finish(conn, job_id, 'a', result=fake_model(DEFAULT_PARAMS, data['n'], data['m'], data['l'], data['r'], run_id))
+    results = collect(path)
+    stored = [json.loads(row[0]) for row in conn.execute("SELECT result FROM jobs ORDER BY id")]
+    feasible = [result['run'] for result in stored if result['status'] != 'infeasible']
+    assert 0 < len(feasible) < len(stored)              # Infeasible runs are left out
+    assert len(results) == len(feasible)
+    assert results.to_dataframe()['run'].tolist() == feasible
+    assert results.instances_dataframe()['run'].tolist() == feasible
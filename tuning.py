@@ -0,0 +1,180 @@
+import argparse
+import bisect
+import json
+import os
+import time
+import numpy as np
+
+# Gurobi parameter tuning per formulation and instance size class.
+#
+# A random search over PARAM_SPACE is run on seeded, feasible training instances
+# of every (n, m) size bucket. The best candidate is kept only if it is also
+# faster on a held-out instance set. Results go to a versioned JSON config, which
+# solver.configure_model reads automatically (params['tuned_params'] points
+# to another file, or None to switch it off).
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tuned_params.json")
+CONFIG_VERSION = 1
+
+N_EDGES = [10, 20, 40, 80]      # Upper bounds of the bar count buckets
+M_EDGES = [10, 20, 40, 80]      # Upper bounds of the order count buckets
+
+PARAM_SPACE = {
+    'MIPFocus': [0, 1, 2, 3],
+    'Presolve': [-1, 0, 1, 2],
+    'Cuts': [-1, 0, 1, 2, 3],
+    'Heuristics': [0.0, 0.05, 0.2, 0.5],
+    'Symmetry': [-1, 0, 2],
+    'Method': [-1, 0, 1, 2]
+}
+
+_loaded = {}                    # path -> (mtime, config)
+
+
+def _edge_label(edges, value):
+    index = bisect.bisect_left(edges, value)
+    return str(edges[index]) if index < len(edges) else 'inf'
+
+
+def size_bucket(n, m):
+    return f"n{_edge_label(N_EDGES, n)}_m{_edge_label(M_EDGES, m)}"
+
+
+def _bucket_range(edges, label):
+    # (lowest, highest) count of a bucket label, e.g. '20' -> (11, 20)
+    if label == 'inf':
+        return edges[-1] + 1, 2 * edges[-1]
+    index = edges.index(int(label))
+    return (edges[index - 1] + 1 if index else 1), edges[index]
+
+
+def load_config(path=DEFAULT_PATH):
+    if not path or not os.path.exists(path):
+        return None
+    mtime = os.path.getmtime(path)
+    if path not in _loaded or _loaded[path][0] != mtime:
+        with open(path) as file:
+            _loaded[path] = (mtime, json.load(file))
+    return _loaded[path][1]
+
+
+def tuned_params(params, name, n, m):
+    config = load_config(params.get('tuned_params', DEFAULT_PATH))
+    if config is None:
+        return {}
+    return config['models'].get(name, {}).get(size_bucket(n, m), {}).get('params', {})
+
+
+def bucket_instances(params, bucket, count, seed, max_draws=100):
+    # count seeded instances of a bucket that pass the necessary feasibility
+    # conditions of bounds.combinatorial_bounds (at most max_draws * count draws)
+    from instances import generate_random_data
+    from bounds import combinatorial_bounds
+    n_label, m_label = bucket[1:].split('_m')
+    min_b, max_b = _bucket_range(N_EDGES, n_label)
+    min_o, max_o = _bucket_range(M_EDGES, m_label)
+    params = dict(params, minB=min_b, maxB=max_b + 1, minO=min_o, maxO=max_o + 1)
+
+    instances = []
+    for k in range(max_draws * count):
+        if len(instances) == count:
+            break
+        n, m, l, r = generate_random_data(params, np.random.RandomState(seed + k))
+        if combinatorial_bounds(params, l, r) is not None:
+            instances.append((n, m, l, r))
+    return instances
+
+
+def _solve_times(model_func, params, instances, solver_params):
+    # Measured solve times and whether each run returned a plan
+    params = dict(params, solver_params=solver_params, tuned_params=None)
+    times, solved = [], []
+    for run_id, (n, m, l, r) in enumerate(instances, start=1):
+        start_time = time.time()
+        result = model_func(params, n, m, l, r, run_id)
+        times.append(result.get('solve_time', time.time() - start_time))
+        solved.append(result.get('status') != 'infeasible')
+    return np.array(times), np.array(solved, dtype=bool)
+
+
+def _feasible(model_func, params, instances):
+    # Instances the default settings solve, as the batch runner keeps them
+    times, solved = _solve_times(model_func, params, instances, {})
+    return [instance for instance, ok in zip(instances, solved) if ok], times[solved]
+
+
+def _geomean(times):
+    return float(np.exp(np.mean(np.log(np.maximum(times, 1e-3)))))
+
+
+def tune_bucket(name, params, bucket, train=10, holdout=10, trials=20, seed=0):
+    from models import get_model
+    model_func = get_model(name)
+    rng = np.random.RandomState(seed)
+
+    train_set, train_times = _feasible(model_func, params, bucket_instances(params, bucket, train, seed))
+    holdout_set, holdout_times = _feasible(model_func, params,
+                                           bucket_instances(params, bucket, holdout, seed + 10**6))
+    if not train_set or not holdout_set:                # Nothing to measure: keep defaults
+        return {'params': {}, 'train_speedup': 1.0, 'holdout_speedup': 1.0, 'train': len(train_set),
+                'holdout': len(holdout_set), 'trials': 0, 'seed': seed}
+
+    best, best_time = {}, _geomean(train_times)
+    baseline_train = best_time
+    for _ in range(trials):
+        candidate = {key: values[rng.randint(len(values))] for key, values in PARAM_SPACE.items()}
+        candidate_time = _geomean(_solve_times(model_func, params, train_set, candidate)[0])
+        if candidate_time < best_time:
+            best, best_time = candidate, candidate_time
+
+    default_holdout = _geomean(holdout_times)
+    tuned_holdout = _geomean(_solve_times(model_func, params, holdout_set, best)[0]) if best else default_holdout
+    speedup = default_holdout / tuned_holdout
+    return {
+        'params': best if speedup > 1 else {},          # Not confirmed on held-out instances: keep defaults
+        'train_speedup': baseline_train / best_time,
+        'holdout_speedup': speedup,
+        'train': len(train_set),                        # Feasible instances actually measured
+        'holdout': len(holdout_set),
+        'trials': trials,
+        'seed': seed
+        }
+
+
+def save_config(results, path=DEFAULT_PATH):
+    # Merges new bucket results into the config and bumps its version
+    config = load_config(path) or {'format': CONFIG_VERSION, 'version': 0, 'models': {}}
+    for name, buckets in results.items():
+        config['models'].setdefault(name, {}).update(buckets)
+    config['version'] += 1
+    config['updated'] = time.strftime('%Y-%m-%d %H:%M:%S')
+    with open(path, 'w') as file:
+        json.dump(config, file, indent=2, sort_keys=True)
+    return config
+
+
+if __name__ == '__main__':
+    from instances import DEFAULT_PARAMS
+
+    parser = argparse.ArgumentParser(description="Tune Gurobi parameters per formulation and size bucket")
+    parser.add_argument('--models', nargs='+', default=['mo', 'm1', 'm2', 'm3'])
+    parser.add_argument('--buckets', nargs='+', default=[size_bucket(10, 10), size_bucket(20, 10)],
+                        help="size buckets such as n10_m10, n20_m10, n40_m20")
+    parser.add_argument('--train', type=int, default=10)
+    parser.add_argument('--holdout', type=int, default=10)
+    parser.add_argument('--trials', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--time-limit', type=float, default=60)
+    parser.add_argument('--output', default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    params = dict(DEFAULT_PARAMS, TimeLimit=args.time_limit)
+    results = {}
+    for name in args.models:
+        for bucket in args.buckets:
+            entry = tune_bucket(name, params, bucket, args.train, args.holdout, args.trials, args.seed)
+            results.setdefault(name, {})[bucket] = entry
+            print(f"{name:<3} {bucket:<10} held-out speedup {entry['holdout_speedup']:.2f}x  {entry['params']}")
+
+    config = save_config(results, args.output)
+    print(f"Saved version {config['version']} to '{args.output}'")
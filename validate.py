@@ -0,0 +1,75 @@
+import numpy as np
+from plan import plan_metrics
+
+# Solver independent check of a returned plan. Everything is recomputed from
+# the assignment matrix alone (plan[i, j] = pieces of order i cut from bar j)
+# and compared with the figures reported in the result dict:
+#   - every order is cut exactly its demanded number of times
+#   - no bar is cut beyond its length
+#   - cuts, waste, used bars and costs match the plan
+# A leftover shorter than W is waste on every cut bar; m1 only reuses leftovers
+# of at least W + epsilon (its constraints 5 and 6), and m3 only returns a
+# leftover to stock when that is cheaper than wasting it (CR <= CW * leftover).
+# The own model (and the dive heuristic built on it) also counts short uncut
+# bars as waste, and so does m1, whose constraints 3 and 4 force z[j] = 1 on
+# every bar. m2 and m3 only count cut bars.
+
+UNUSED_WASTE = {'modelO': True, 'dive': True, 'model1': True}
+CHECKED_FIGURES = ['cuts', 'cuts_cost', 'waste', 'waste_cost', 'used_bars', 'total_cost']
+
+
+def reusable_from(params, model):
+    # Shortest leftover a formulation keeps instead of counting it as waste
+    if model == 'model1':
+        return params['W'] + params['epsilon']
+    if model == 'model3':
+        if params['CW'] > 0:
+            return max(params['W'], params['CR'] / params['CW'])
+        return params['W'] if params['CR'] <= 0 else np.inf
+    return params['W']
+
+
+def validate_plan(params, l, r, plan, result=None, q=None, atol=1e-4, rtol=1e-6):
+    # Returns a list of problems, empty if the plan and its figures are consistent
+    l = np.asarray(l)
+    r = np.asarray(r)
+    plan = np.asarray(plan)
+    problems = []
+
+    if plan.shape != (len(r), len(l)):
+        return [f"plan shape {plan.shape} does not match {len(r)} orders x {len(l)} bars"]
+    if (plan < 0).any() or not np.array_equal(plan, np.round(plan)):
+        problems.append("plan has negative or fractional entries")
+
+    demand = np.ones(len(r), dtype=np.int64) if q is None else np.asarray(q)
+    if demand.shape != (len(r),):
+        return problems + [f"demand shape {demand.shape} does not match {len(r)} orders"]
+    coverage = plan.sum(axis=1)
+    wrong = np.flatnonzero(coverage != demand)
+    if len(wrong):
+        problems.append(f"orders {wrong.tolist()} cut {coverage[wrong].tolist()} times, "
+                        f"demand {demand[wrong].tolist()}")
+
+    load = r @ plan
+    over = np.flatnonzero(load > l)
+    if len(over):
+        problems.append(f"bars {over.tolist()} cut {load[over].tolist()} beyond length {l[over].tolist()}")
+
+    if result is not None:
+        model = result.get('model')
+        figures = plan_metrics(params, l, r, plan, unused_waste=UNUSED_WASTE.get(model, False),
+                               reusable_from=reusable_from(params, model))
+        keys = [key for key in CHECKED_FIGURES if key in result]
+        reported = np.array([result[key] for key in keys], dtype=np.float64)
+        recomputed = np.array([figures[key] for key in keys], dtype=np.float64)
+        for k in np.flatnonzero(~np.isclose(reported, recomputed, atol=atol, rtol=rtol)):
+            problems.append(f"{keys[k]} reported {result[keys[k]]} but plan gives {figures[keys[k]]}")
+
+    return problems
+
+
+def validate_result(params, l, r, result, q=None):
+    # Validates a run_cso_* result dict that carries its plan
+    if 'plan' not in result:
+        return ["result has no plan"]
+    return validate_plan(params, l, r, result['plan'], result, q)
@@ -0,0 +1,220 @@
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import numpy as np
+from instances import DEFAULT_PARAMS, seeded_instances
+from models import BATCH_MODELS, get_model
+from results_store import ResultStore
+
+# Distributed batch over a SQLite work queue on a shared filesystem.
+#
+#   python workqueue.py init queue.db --runs 100     enumerate (instance, model) jobs
+#   python workqueue.py work queue.db                start a worker (any number, any node)
+#   python workqueue.py collect queue.db             assemble the results table
+#
+# Workers claim jobs in an IMMEDIATE transaction and hold them under a lease that
+# a heartbeat thread renews. A crashed worker's lease expires and the job is
+# claimed again (up to max_attempts). Results are only written while the writer
+# still owns the lease, so a job that was re-claimed is never stored twice.
+# Workers validate every plan before storing the result (without the plan); a
+# plan that fails validation marks the job failed right away.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    run INTEGER NOT NULL,
+    model TEXT NOT NULL,
+    instance TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    result TEXT,
+    error TEXT,
+    UNIQUE (run, model)
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+LEASE = 300             # Seconds a claimed job stays owned without a heartbeat
+MAX_ATTEMPTS = 3
+
+
+def _json_default(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Not JSON serializable: {type(value)}")
+
+
+def connect(path):
+    # Rollback journal instead of WAL: WAL needs shared memory, which network
+    # filesystems do not provide
+    conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def init_queue(path, params, num_runs, seed=0, models=BATCH_MODELS):
+    conn = connect(path)
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute("INSERT OR REPLACE INTO meta VALUES ('params', ?)", (json.dumps(params),))
+    for run_id, (n, m, l, r) in enumerate(seeded_instances(params, num_runs, seed), start=1):
+        instance = json.dumps({'n': n, 'm': m, 'l': l, 'r': r}, default=_json_default)
+        for name in models:
+            conn.execute("INSERT OR IGNORE INTO jobs (run, model, instance) VALUES (?, ?, ?)",
+                         (run_id, name, instance))
+    conn.execute("COMMIT")
+    conn.close()
+
+
+def claim(conn, worker, lease=LEASE, max_attempts=MAX_ATTEMPTS):
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Expired leases that used up their attempts are given up
+        conn.execute("UPDATE jobs SET status = 'failed', worker = NULL, lease_until = NULL "
+                     "WHERE status = 'running' AND lease_until < ? AND attempts >= ?", (now, max_attempts))
+        row = conn.execute("SELECT id, run, model, instance FROM jobs "
+                           "WHERE status = 'pending' OR (status = 'running' AND lease_until < ?) "
+                           "ORDER BY id LIMIT 1", (now,)).fetchone()
+        if row is not None:
+            conn.execute("UPDATE jobs SET status = 'running', worker = ?, lease_until = ?, "
+                         "attempts = attempts + 1 WHERE id = ?", (worker, now + lease, row[0]))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return row
+
+
+def _heartbeat(path, job_id, worker, lease, stop):
+    conn = connect(path)
+    while not stop.wait(lease / 3):
+        conn.execute("UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                     (time.time() + lease, job_id, worker))
+    conn.close()
+
+
+def finish(conn, job_id, worker, result=None, error=None, max_attempts=MAX_ATTEMPTS):
+    # Only the current lease owner may write; returns False if the job was lost
+    if error is None:
+        cursor = conn.execute("UPDATE jobs SET status = 'done', result = ?, lease_until = NULL "
+                              "WHERE id = ? AND worker = ? AND status = 'running'",
+                              (json.dumps(result, default=_json_default), job_id, worker))
+    else:
+        cursor = conn.execute("UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                              "error = ?, worker = NULL, lease_until = NULL "
+                              "WHERE id = ? AND worker = ? AND status = 'running'",
+                              (max_attempts, error, job_id, worker))
+    return cursor.rowcount == 1
+
+
+def work(path, lease=LEASE, max_attempts=MAX_ATTEMPTS, poll=10):
+    import gurobipy
+    from lagrangian import attach_bound
+    from validate import validate_result
+    env = gurobipy.Env(empty=True)                      # One environment for all jobs of this worker
+    env.setParam('OutputFlag', 0)
+    env.start()
+
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    conn = connect(path)
+    params = json.loads(conn.execute("SELECT value FROM meta WHERE key = 'params'").fetchone()[0])
+    done = 0
+
+    while True:
+        row = claim(conn, worker, lease, max_attempts)
+        if row is None:
+            # Wait while other workers still hold leases that may expire
+            if conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'running'").fetchone()[0] == 0:
+                break
+            time.sleep(poll)
+            continue
+
+        job_id, run_id, name, instance = row
+        data = json.loads(instance)
+        stop = threading.Event()
+        beat = threading.Thread(target=_heartbeat, args=(path, job_id, worker, lease, stop), daemon=True)
+        beat.start()
+        try:
+            l, r = np.array(data['l']), np.array(data['r'])
+            result = get_model(name)(params, data['n'], data['m'], l, r, run_id, env=env)
+            problems = [] if result.get('status') == 'infeasible' else validate_result(params, l, r, result)
+            if problems:                                # Same instance and settings would fail again
+                stored = finish(conn, job_id, worker, error=f"failed validation: {'; '.join(problems)}",
+                                max_attempts=0)
+            else:
+                if name == 'mo':
+                    try:
+                        attach_bound(result, params, data['n'], data['m'], l, r)
+                    except Exception:                   # The validated result is kept without a bound
+                        pass
+                result.pop('plan', None)
+                stored = finish(conn, job_id, worker, result=result)
+        except Exception as error:
+            stored = finish(conn, job_id, worker, error=repr(error), max_attempts=max_attempts)
+        finally:
+            stop.set()
+            beat.join()
+        done += stored
+
+    conn.close()
+    return done
+
+
+def progress(path):
+    conn = connect(path)
+    counts = dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+    conn.close()
+    return counts
+
+
+def collect(path):
+    # ResultStore of finished jobs like mainRunner2.run_batch builds it: feasible
+    # results ordered by run and model, instance data once per stored run
+    conn = connect(path)
+    rows = conn.execute("SELECT run, instance, result FROM jobs WHERE status = 'done' ORDER BY run, id").fetchall()
+    conn.close()
+
+    results = ResultStore()
+    stored_runs = set()
+    for run_id, instance, result in rows:
+        result = json.loads(result)
+        if result.get('status') == 'infeasible':
+            continue                                    # Infeasible runs are not stored
+        results.add(result)
+        if run_id not in stored_runs:
+            data = json.loads(instance)
+            results.add_instance(run_id, data['l'], data['r'])
+            stored_runs.add(run_id)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="SQLite work queue for batch experiments")
+    parser.add_argument('command', choices=['init', 'work', 'status', 'collect'])
+    parser.add_argument('db')
+    parser.add_argument('--runs', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--lease', type=float, default=LEASE)
+    parser.add_argument('--output', default="cutting_stock_results.xlsx")
+    args = parser.parse_args()
+
+    if args.command == 'init':
+        init_queue(args.db, DEFAULT_PARAMS, args.runs, args.seed)
+        print(f"Queue initialized: {progress(args.db)}")
+    elif args.command == 'work':
+        print(f"Jobs completed by this worker: {work(args.db, args.lease)}")
+    elif args.command == 'status':
+        print(progress(args.db))
+    else:
+        results = collect(args.db)
+        results.save(args.output)                       # Results sheet plus one 'instances' sheet
+        print(f"{len(results)} results saved to '{args.output}' ({progress(args.db)})")